@@ -291,6 +291,121 @@ class Grid:
         return bools
 
 
+class BitGrid(Grid):
+    """
+    A boolean Grid backed by a single arbitrary-precision int instead of a list
+    of lists.  Cell (x,y) is bit x * height + y of self.bits, so grid[x][y]
+    reads and writes work exactly as with a Grid, while copy, count, as_list,
+    __hash__ and __eq__ work on whole machine words instead of single cells.
+
+    Since ints are immutable, copying a BitGrid is O(1): this is what food
+    grids use, as they are copied every time a pellet is eaten.
+    """
+
+    def __init__(self, width, height, initial_value=False, bit_representation=None):
+        if initial_value not in [False, True]:
+            raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = self._full_mask() if initial_value else 0
+        if bit_representation:
+            self._unpack_bits(bit_representation)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Builds a BitGrid holding the same cells as a list-backed Grid."""
+        g = cls(grid.width, grid.height)
+        for x, y in grid.as_list():
+            g.bits |= 1 << (x * g.height + y)
+        return g
+
+    def _full_mask(self):
+        return (1 << (self.width * self.height)) - 1
+
+    @property
+    def data(self):
+        """A list of lists snapshot of the cells, as stored by a Grid."""
+        return [[(self.bits >> (x * self.height + y)) & 1 == 1 for y in range(self.height)]
+                for x in range(self.width)]
+
+    def __str__(self):
+        data = self.data # Built once, not once per cell
+        out = [[str(data[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.width:
+            raise IndexError('BitGrid column index out of range')
+        return _BitGridColumn(self, i)
+
+    def __setitem__(self, key, item):
+        column = _BitGridColumn(self, key)
+        for y, value in enumerate(item):
+            column[y] = value
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        if isinstance(other, BitGrid):
+            return self.width == other.width and self.height == other.height and self.bits == other.bits
+        return self.data == other.data
+
+    def __hash__(self):
+        # Same value as Grid.__hash__, whose loop builds this very bitmask
+        return hash(self.bits)
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        return g
+
+    def shallow_copy(self):
+        return self.copy()
+
+    def count(self, item=True):
+        ones = bin(self.bits).count('1')
+        return ones if item else self.width * self.height - ones
+
+    def as_list(self, key=True):
+        list_coordinates = []
+        height = self.height
+        bits = self.bits if key else ~self.bits & self._full_mask()
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            list_coordinates.append((index // height, index % height))
+            bits ^= lowest
+        return list_coordinates
+
+
+class _BitGridColumn:
+    """The grid[x] view of a BitGrid, so that grid[x][y] keeps working."""
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.offset = x * grid.height
+
+    def __len__(self):
+        return self.grid.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.grid.height:
+            raise IndexError('BitGrid row index out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if not 0 <= y < self.grid.height:
+            raise IndexError('BitGrid row index out of range')
+        if value:
+            self.grid.bits |= 1 << (self.offset + y)
+        else:
+            self.grid.bits &= ~(1 << (self.offset + y))
+
+
 def reconstitute_grid(bit_rep):
     if type(bit_rep) is not type((1, 2)):
         return bit_rep
@@ -395,12 +510,17 @@ class GameStateData:
 
     def __init__(self, prev_state=None):
         """
-        Generates a new data packet by copying information from its predecessor.
+        Generates a new data packet from its predecessor.
+
+        The data is copy-on-write: the food grid, the capsule list, the eaten
+        list and every AgentState are shared with prev_state, so code changing
+        any of them must first replace it with its own copy (see
+        copy_agent_state).
         """
         if prev_state is not None:
             self.food = prev_state.food.shallow_copy()
-            self.capsules = prev_state.capsules[:]
-            self.agent_states = self.copy_agent_states(prev_state.agent_states)
+            self.capsules = prev_state.capsules
+            self.agent_states = prev_state.agent_states[:]
             self.layout = prev_state.layout
             self._eaten = prev_state._eaten
             self.score = prev_state.score
@@ -416,6 +536,9 @@ class GameStateData:
     def deep_copy(self):
         state = GameStateData(self)
         state.food = self.food.deep_copy()
+        state.capsules = self.capsules[:]
+        state.agent_states = self.copy_agent_states(self.agent_states)
+        state._eaten = self._eaten[:]
         state.layout = self.layout.deep_copy()
         state._agent_moved = self._agent_moved
         state._food_eaten = self._food_eaten
@@ -429,6 +552,15 @@ class GameStateData:
             copied_states.append(agentState.copy())
         return copied_states
 
+    def copy_agent_state(self, agent_index):
+        """
+        Replaces the (possibly shared) state of the given agent with a private
+        copy and returns it, so that it can be modified safely.
+        """
+        agent_state = self.agent_states[agent_index].copy()
+        self.agent_states[agent_index] = agent_state
+        return agent_state
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -14,6 +14,7 @@
 
 from util import manhattan_distance
 from game import Grid
+from game import BitGrid
 import os
 import random
 from functools import reduce
@@ -30,7 +31,7 @@ class Layout:
         self.width = len(layout_text[0])
         self.height = len(layout_text)
         self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        self.food = BitGrid(self.width, self.height, False)
         self.capsules = []
         self.agent_positions = []
         self.num_ghosts = 0
@@ -15,7 +15,8 @@
 from util import manhattan_distance
 from game import Directions, Actions
 from pacman import GhostRules
-import random, util
+import collections, concurrent.futures, multiprocessing, random, time, util
+import ghost_agents
 from game import Agent
 
 class ReflexAgent(Agent):
@@ -126,11 +127,300 @@ class MultiAgentSearchAgent(Agent):
     is another abstract class.
     """
 
-    def __init__(self, eval_fn='score_evaluation_function', depth='2'):
+    # Part of the move timeout of the rules left unused by iterative deepening
+    MOVE_TIME_MARGIN = 0.2
+
+    def __init__(self, eval_fn='score_evaluation_function', depth='2', table_size='0', move_time='0'):
         super().__init__()
         self.index = 0 # Pacman is always agent index 0
         self.evaluation_function = util.lookup(eval_fn, globals())
         self.depth = int(depth) 
+        # Transposition table kept across the turns of a game (-a table_size=N)
+        self.transposition_table = TranspositionTable(int(table_size)) if int(table_size) > 0 else None
+        # Seconds per move searched by iterative deepening instead of a fixed
+        # depth (-a move_time=S), see search_action
+        self.move_time = float(move_time)
+        self.deadline = None
+        self.reached_horizon = False
+        self.searched_depth = 0
+
+    def register_initial_state(self, game_state):
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+
+    def set_move_timeout(self, timeout):
+        """Called by the rules with the time an agent is allowed per move."""
+        if self.move_time > 0:
+            self.move_time = min(self.move_time, timeout * (1 - self.MOVE_TIME_MARGIN))
+
+    def search_action(self, game_state, search):
+        """
+        Returns the action chosen by search(game_state, depth, first_action),
+        a search self.depth plies deep.  Iterative deepening is opt-in: only
+        with move_time set (-a move_time=S) is it the action of the deepest
+        of the searches 1, 2, 3... plies deep that completed in move_time
+        seconds, ignoring self.depth.  Each search tries the action of the
+        one before first, and the first one always completes.
+
+        Searches call check_time, and stop the deepening by leaving
+        self.reached_horizon False if no state was cut off by the depth.
+        """
+        if self.move_time <= 0:
+            self.searched_depth = self.depth
+            return search(game_state, self.depth, None)
+
+        start_time = time.perf_counter()
+        action = None
+        depth = 0
+        while True:
+            self.deadline = start_time + self.move_time if depth > 0 else None
+            self.reached_horizon = False
+            try:
+                action = search(game_state, depth + 1, action)
+            except SearchTimeout:
+                break
+            depth += 1
+            if not self.reached_horizon or time.perf_counter() > start_time + self.move_time:
+                break
+        self.deadline = None
+        self.searched_depth = depth
+        return action
+
+    def move_first(actions, first):
+        """Returns the list actions with first, if in it, moved to the front."""
+        if first in actions:
+            actions = [first] + [action for action in actions if action != first]
+        return actions
+    move_first = staticmethod(move_first)
+
+    def check_time(self):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+class SearchTimeout(Exception):
+    """Stops a search that ran out of time, see MultiAgentSearchAgent.search_action."""
+
+class TranspositionTable:
+    """
+    A fixed-size table of the values found by the adversarial search agents,
+    so that positions reached again through other move orders (ghosts going
+    back and forth, Pacman and a ghost swapping the order of their moves) are
+    not searched again.
+
+    States are Zobrist hashed: every feature of a position (an agent's
+    configuration, a scared timer, a food pellet, a capsule) has a random
+    64-bit key and the hash of a state is the xor of the keys of its features,
+    so that hash_successor only has to xor in and out what a move changed.
+    The agent to move and the remaining depth are xored in at lookup.
+    Pacman's direction is left out, since the rules ignore it.
+
+    Values are stored relative to the score of their state, which depends on
+    the path to it, so that they stay valid across turns.  This assumes the
+    evaluation function is the score plus a function of the hashed features,
+    as score_evaluation_function is.
+
+    Every slot keeps one entry (key, depth, generation, value, flag, move); a
+    new entry replaces one of an earlier search, or one searched to a depth
+    no greater than its own.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, size=1 << 16, seed=0):
+        self.size = 1 << max(0, size - 1).bit_length() # A power of two
+        self.mask = self.size - 1
+        self.random = random.Random(seed) # Leaves the game's random state alone
+        self.keys = {}
+        self.clear()
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.probes = self.hits = self.stores = 0
+
+    def new_search(self):
+        """Marks the entries stored so far as replaceable."""
+        self.generation += 1
+
+    def key(self, feature):
+        key = self.keys.get(feature)
+        if key is None:
+            key = self.keys[feature] = self.random.getrandbits(64)
+        return key
+
+    def agent_key(self, agent_index, agent_state):
+        configuration = agent_state.configuration
+        direction = configuration.direction if agent_index > 0 else None
+        key = self.key(('agent', agent_index, configuration.pos, direction))
+        if agent_state.scared_timer > 0:
+            key ^= self.key(('scared', agent_index, agent_state.scared_timer))
+        return key
+
+    def hash_state(self, game_state):
+        data = game_state.data
+        h = 0
+        for agent_index, agent_state in enumerate(data.agent_states):
+            h ^= self.agent_key(agent_index, agent_state)
+        for position in data.food.as_list():
+            h ^= self.key(('food', position))
+        for position in data.capsules:
+            h ^= self.key(('capsule', position))
+        return h
+
+    def hash_successor(self, h, game_state, successor):
+        """
+        Returns the hash of successor, generated from game_state whose hash
+        is h.  Agent states are shared between a state and its successor
+        unless they change, so only the changed ones are hashed again.
+        """
+        agent_states = game_state.data.agent_states
+        data = successor.data
+        for agent_index, agent_state in enumerate(data.agent_states):
+            if agent_state is not agent_states[agent_index]:
+                h ^= self.agent_key(agent_index, agent_states[agent_index]) ^ self.agent_key(agent_index, agent_state)
+        if data._food_eaten is not None:
+            h ^= self.key(('food', data._food_eaten))
+        if data._capsule_eaten is not None:
+            h ^= self.key(('capsule', data._capsule_eaten))
+        return h
+
+    def lookup(self, h, agent_index, depth, score):
+        """
+        Returns (value, flag, move) stored for the state hashed to h, with
+        score, agent_index to move and depth plies left, or None.
+        """
+        self.probes += 1
+        key = h ^ self.key(('turn', agent_index, depth))
+        entry = self.entries[key & self.mask]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[3] + score, entry[4], entry[5]
+
+    def store(self, h, agent_index, depth, score, value, flag, move):
+        key = h ^ self.key(('turn', agent_index, depth))
+        slot = key & self.mask
+        entry = self.entries[slot]
+        if entry is None or entry[0] == key or entry[2] != self.generation or depth >= entry[1]:
+            self.entries[slot] = (key, depth, self.generation, value - score, flag, move)
+            self.stores += 1
+
+class MoveOrdering:
+    """
+    The order in which AlphaBetaAgent tries the actions of a state: this one
+    keeps the order of the engine, with the best move stored in the
+    transposition table or the best action of the previous iterative
+    deepening search first, and subclasses reorder it.
+
+    It also counts the states searched and the cutoffs, to compare
+    orderings: the better the ordering, the more cutoffs happen on the first
+    action tried.  Plies count the moves of every agent from the root.
+    """
+
+    def __init__(self):
+        self.nodes = self.cutoffs = self.first_cutoffs = 0
+
+    def new_search(self, game_state, num_agents):
+        """Called at the start of every alpha-beta search from game_state."""
+        pass
+
+    def order(self, game_state, agent_index, ply, actions, first=None):
+        """Returns the actions of the state, in the order to try them."""
+        self.nodes += 1
+        return MultiAgentSearchAgent.move_first(actions, first)
+
+    def child(self, ply, action):
+        """Called before the successor of the state by action is searched."""
+        pass
+
+    def best(self, ply, action):
+        """Called when action becomes the best one of the state."""
+        pass
+
+    def cutoff(self, game_state, agent_index, ply, action, index, depth_left):
+        """Called when action, the index-th one tried, cuts off the search."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_cutoffs += 1
+
+    def cutoff_rate(self):
+        return self.cutoffs / float(self.nodes) if self.nodes else 0.0
+
+    def first_cutoff_rate(self):
+        return self.first_cutoffs / float(self.cutoffs) if self.cutoffs else 0.0
+
+class KillerHistoryOrdering(MoveOrdering):
+    """
+    Tries actions in this order (-a ordering=KillerHistoryOrdering):
+
+      1. the action of the principal variation of the previous search from
+         the same root, while the search follows it, or else the first one
+         given (the transposition table move)
+      2. the killer moves of the ply, the last two actions that cut off a
+         search at the same ply
+      3. the others by history score, the sum of depth_left ** 2 over the
+         cutoffs by the same agent, action and position, and for ghosts
+         toward Pacman first (away from him while scared)
+
+    Killers and the principal variation are kept between the iterative
+    deepening searches of a turn, and history scores are halved every turn.
+    """
+    KILLERS = 2
+
+    def __init__(self):
+        super().__init__()
+        self.root = None
+        self.history = {}
+
+    def new_search(self, game_state, num_agents):
+        if game_state is not self.root:
+            self.root = game_state
+            self.pv = []
+            self.killers = {}
+            for key in self.history:
+                self.history[key] //= 2
+        else:
+            self.pv = self.pv_table.get(0, [])
+        self.pv_table = {}
+        self.on_pv = {0: True}
+
+    def order(self, game_state, agent_index, ply, actions, first=None):
+        self.nodes += 1
+        if self.on_pv.get(ply) and ply < len(self.pv):
+            first = self.pv[ply]
+        killers = self.killers.get(ply, ())
+        position = game_state.data.agent_states[agent_index].get_position()
+        if agent_index > 0:
+            pacman_position = game_state.get_pacman_position()
+            toward = 1 if game_state.data.agent_states[agent_index].scared_timer == 0 else -1
+        history = self.history
+
+        def key(action):
+            if action == first:
+                return (0, 0, 0)
+            if action in killers:
+                return (1, 0, 0)
+            distance = 0
+            if agent_index > 0:
+                dx, dy = Actions.direction_to_vector(action)
+                distance = toward * manhattan_distance((position[0] + dx, position[1] + dy), pacman_position)
+            return (2, -history.get((agent_index, action, position), 0), distance)
+        return sorted(actions, key=key)
+
+    def child(self, ply, action):
+        self.on_pv[ply + 1] = self.on_pv.get(ply) and ply < len(self.pv) and self.pv[ply] == action
+        self.pv_table[ply + 1] = []
+
+    def best(self, ply, action):
+        self.pv_table[ply] = [action] + self.pv_table.get(ply + 1, [])
+
+    def cutoff(self, game_state, agent_index, ply, action, index, depth_left):
+        super().cutoff(game_state, agent_index, ply, action, index, depth_left)
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[self.KILLERS:]
+        key = (agent_index, action, game_state.data.agent_states[agent_index].get_position())
+        self.history[key] = self.history.get(key, 0) + depth_left * depth_left
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -160,35 +450,65 @@ class MinimaxAgent(MultiAgentSearchAgent):
         Returns whether or not the game state is a losing state
         """
         "*** YOUR CODE HERE ***"
+        return self.search_action(game_state, self.minimax_action)
+
+    def minimax_action(self, game_state, depth_limit, first_action=None):
+        """
+        Returns the minimax action from game_state searched depth_limit plies
+        deep, trying first_action first.
+        """
         import sys
 
         num_agents = game_state.get_num_agents()
         pacman_index = 0
         INITIAL_DEPTH = 0
+        table = self.transposition_table
 
-        def max_func(game_state, depth):
+        def max_func(game_state, depth, h=None):
             # Base case for Pacman
-            if depth == self.depth or game_state.is_win() or game_state.is_lose():
+            if game_state.is_win() or game_state.is_lose():
+                return self.evaluation_function(game_state), None
+            if depth == depth_limit:
+                self.reached_horizon = True
                 return self.evaluation_function(game_state), None
+            self.check_time()
+            if h is not None:
+                entry = table.lookup(h, pacman_index, depth_limit - depth, game_state.get_score())
+                if entry is not None:
+                    self.reached_horizon = True
+                    return entry[0], entry[2]
 
             max_score = -sys.maxsize
             best_action = None
             
+            actions = game_state.get_legal_actions(pacman_index)
+            if depth == INITIAL_DEPTH:
+                actions = self.move_first(actions, first_action)
+
             # Loop through all possible actions for Pacman
-            for action in game_state.get_legal_actions(pacman_index):
+            for action in actions:
                 successor_state = game_state.generate_successor(pacman_index, action)
-                score, _ = min_func(1, depth, successor_state)  # Min function for first ghost
+                successor_h = None if h is None else table.hash_successor(h, game_state, successor_state)
+                score, _ = min_func(1, depth, successor_state, successor_h)  # Min function for first ghost
                 
                 if score > max_score:
                     max_score = score
                     best_action = action
 
+            if h is not None:
+                table.store(h, pacman_index, depth_limit - depth, game_state.get_score(),
+                            max_score, table.EXACT, best_action)
             return max_score, best_action
 
-        def min_func(agent_index, depth, game_state):
+        def min_func(agent_index, depth, game_state, h=None):
             # Base case for Ghosts
             if game_state.is_win() or game_state.is_lose():
                 return self.evaluation_function(game_state), None
+            if h is not None:
+                entry = table.lookup(h, agent_index, depth_limit - depth, game_state.get_score())
+                if entry is not None:
+                    self.reached_horizon = True
+                    return entry[0], entry[2]
 
             min_score = sys.maxsize
             best_action = None
@@ -196,19 +516,27 @@ class MinimaxAgent(MultiAgentSearchAgent):
             # Loop through all possible actions for this ghost
             for action in game_state.get_legal_actions(agent_index):
                 successor_state = game_state.generate_successor(agent_index, action)
+                successor_h = None if h is None else table.hash_successor(h, game_state, successor_state)
                 
                 if agent_index == num_agents - 1:  # Last ghost moves, Pacman goes next
-                    score, _ = max_func(successor_state, depth + 1)
+                    score, _ = max_func(successor_state, depth + 1, successor_h)
                 else:  # Next ghost moves
-                    score, _ = min_func(agent_index + 1, depth, successor_state)
+                    score, _ = min_func(agent_index + 1, depth, successor_state, successor_h)
 
                 if score < min_score:
                     min_score = score
                     best_action = action
 
+            if h is not None:
+                table.store(h, agent_index, depth_limit - depth, game_state.get_score(),
+                            min_score, table.EXACT, best_action)
             return min_score, best_action
 
-        _, action = max_func(game_state, INITIAL_DEPTH)
+        if table is None:
+            _, action = max_func(game_state, INITIAL_DEPTH)
+        else:
+            table.new_search()
+            _, action = max_func(game_state, INITIAL_DEPTH, table.hash_state(game_state))
         return action
 
 class AlphaBetaAgent(MultiAgentSearchAgent):
@@ -216,75 +544,269 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
     Your minimax agent with alpha-beta pruning (question 3)
     """
 
+    def __init__(self, ordering='MoveOrdering', workers='0', **args):
+        super().__init__(**args)
+        # The MoveOrdering subclass trying actions (-a ordering=NAME)
+        self.ordering = util.lookup(ordering, globals())()
+        # Processes searching the root actions in parallel (-a workers=N)
+        self.workers = int(workers)
+        self.worker_args = dict(args, ordering=ordering)
+        self.executor = None
+        self.shared_alpha = None
+        # Games played, so that workers know when to clear their tables
+        self.game_number = 0
+
+    def register_initial_state(self, game_state):
+        super().register_initial_state(game_state)
+        self.game_number += 1
+
     def get_action(self, game_state):
         """
         Returns the minimax action using self.depth and self.evaluation_function
         """
         "*** YOUR CODE HERE ***"
+        if self.workers > 1:
+            return self.search_action(game_state, self.parallel_alpha_beta_action)
+        return self.search_action(game_state, self.alpha_beta_action)
+
+    def alpha_beta_action(self, game_state, depth_limit, first_action=None):
+        """
+        Returns the minimax action from game_state searched depth_limit plies
+        deep with alpha-beta pruning, trying first_action first.
+        """
+        return self.alpha_beta_search(game_state, depth_limit, first_action)[1]
+
+    def alpha_beta_search(self, game_state, depth_limit, first_action=None, root_action=None, alpha=None):
+        """
+        Returns the (value, action) of alpha_beta_action, or with root_action
+        the value of Pacman's root_action alone searched above alpha.
+        """
         import sys
 
         num_agents = game_state.get_num_agents()
         pacman_index = 0
         INITIAL_DEPTH = 0
-
-        def max_func(game_state, depth, alpha, beta):
-            if depth == self.depth or game_state.is_win() or game_state.is_lose():
+        table = self.transposition_table
+        ordering = self.ordering
+        ordering.new_search(game_state, num_agents)
+        shared_alpha = self.shared_alpha
+
+        def probe(h, agent_index, depth, game_state, alpha, beta):
+            """
+            Returns the stored (value, move) of the state if it decides the
+            search with this window, else (None, the stored best move).
+            """
+            entry = table.lookup(h, agent_index, depth_limit - depth, game_state.get_score())
+            if entry is None:
+                return None, None
+            value, flag, move = entry
+            self.reached_horizon = True
+            if flag == table.EXACT or (flag == table.LOWER and value > beta) or (flag == table.UPPER and value < alpha):
+                return value, move
+            return None, move
+
+        def store(h, agent_index, depth, game_state, alpha, beta, value, action):
+            if shared_alpha is not None:
+                # The searches of other root actions may have raised alpha
+                # while this state was searched, cutting below the new alpha
+                alpha = max(alpha, shared_alpha.value)
+            # A cut value only bounds the true one (cuts are strict, see max_func)
+            flag = table.LOWER if value > beta else table.UPPER if value < alpha else table.EXACT
+            table.store(h, agent_index, depth_limit - depth, game_state.get_score(), value, flag, action)
+
+        def max_func(game_state, depth, alpha, beta, h=None):
+            if game_state.is_win() or game_state.is_lose():
+                return self.evaluation_function(game_state), None
+            if depth == depth_limit:
+                self.reached_horizon = True
                 return self.evaluation_function(game_state), None
+            self.check_time()
+            if shared_alpha is not None:
+                alpha = max(alpha, shared_alpha.value)
+            first = first_action if depth == INITIAL_DEPTH else None
+            if h is not None:
+                value, move = probe(h, pacman_index, depth, game_state, alpha, beta)
+                if value is not None:
+                    return value, move
+                # The best move stored in the table is searched first
+                first = move or first
+                alpha_0, beta_0 = alpha, beta
+            ply = depth * num_agents
+            actions = ordering.order(game_state, pacman_index, ply, game_state.get_legal_actions(pacman_index), first)
 
             max_score = -sys.maxsize
             best_action = None
             
-            for action in game_state.get_legal_actions(pacman_index):
+            for index, action in enumerate(actions):
+                ordering.child(ply, action)
                 successor_state = game_state.generate_successor(pacman_index, action)
-                score, _ = min_func(1, depth, successor_state, alpha, beta)
+                successor_h = None if h is None else table.hash_successor(h, game_state, successor_state)
+                score, _ = min_func(1, depth, successor_state, alpha, beta, successor_h)
                 
                 if score > max_score:
                     max_score = score
                     best_action = action
+                    ordering.best(ply, action)
                 
                 if max_score > beta: # Beta-cut (we don't take into account equality to avoid expanding unnecessary nodes)
-                    return max_score, best_action
+                    ordering.cutoff(game_state, pacman_index, ply, action, index, (depth_limit - depth) * num_agents)
+                    break
                 
                 alpha = max(alpha , max_score) # Alpha is updated with the max value (MAX is playing)
 
+            if h is not None:
+                store(h, pacman_index, depth, game_state, alpha_0, beta_0, max_score, best_action)
             return max_score, best_action
 
-        def min_func(agent_index, depth, game_state, alpha, beta):
+        def min_func(agent_index, depth, game_state, alpha, beta, h=None):
             if game_state.is_win() or game_state.is_lose():
                 return self.evaluation_function(game_state), None
+            if shared_alpha is not None:
+                alpha = max(alpha, shared_alpha.value)
+            move = None
+            if h is not None:
+                value, move = probe(h, agent_index, depth, game_state, alpha, beta)
+                if value is not None:
+                    return value, move
+                alpha_0, beta_0 = alpha, beta
+            ply = depth * num_agents + agent_index
+            actions = ordering.order(game_state, agent_index, ply, game_state.get_legal_actions(agent_index), move)
 
             min_score = sys.maxsize
             best_action = None
             
-            for action in game_state.get_legal_actions(agent_index):
+            for index, action in enumerate(actions):
+                ordering.child(ply, action)
                 successor_state = game_state.generate_successor(agent_index, action)
+                successor_h = None if h is None else table.hash_successor(h, game_state, successor_state)
                 
                 if agent_index == num_agents - 1:
-                    score, _ = max_func(successor_state, depth + 1, alpha, beta)
+                    score, _ = max_func(successor_state, depth + 1, alpha, beta, successor_h)
                 else:
-                    score, _ = min_func(agent_index + 1, depth, successor_state, alpha, beta)
+                    score, _ = min_func(agent_index + 1, depth, successor_state, alpha, beta, successor_h)
 
                 if score < min_score:
                     min_score = score
                     best_action = action
+                    ordering.best(ply, action)
 
                 if min_score < alpha: # Alpha-cut (we don't take into account equality to avoid expanding unnecessary nodes)
-                    return min_score, best_action
+                    ordering.cutoff(game_state, agent_index, ply, action, index, (depth_limit - depth) * num_agents - agent_index)
+                    break
                 
                 beta = min(min_score, beta) #  Beta is updated with the min value (MIN is playing)
                 
+            if h is not None:
+                store(h, agent_index, depth, game_state, alpha_0, beta_0, min_score, best_action)
             return min_score, best_action
 
-        alpha = -sys.maxsize
+        alpha = -sys.maxsize if alpha is None else alpha
         beta = sys.maxsize
-        _, action = max_func(game_state, INITIAL_DEPTH, alpha, beta)
-        return action
+        h = None
+        if table is not None:
+            table.new_search()
+            h = table.hash_state(game_state)
+        if root_action is None:
+            return max_func(game_state, INITIAL_DEPTH, alpha, beta, h)
+
+        ordering.child(INITIAL_DEPTH, root_action)
+        successor_state = game_state.generate_successor(pacman_index, root_action)
+        successor_h = None if h is None else table.hash_successor(h, game_state, successor_state)
+        return min_func(1, INITIAL_DEPTH, successor_state, alpha, beta, successor_h)[0], root_action
+
+    def parallel_alpha_beta_action(self, game_state, depth_limit, first_action=None):
+        """
+        Returns the action of alpha_beta_action, searching Pacman's root
+        actions in a pool of self.workers processes (-a workers=N).
+
+        The first root action is searched here (the eldest brother of Young
+        Brothers Wait), then the others in parallel above its value.  Every
+        value found raises the alpha shared with the searches through
+        shared memory, which they read at every state.  A search given a
+        higher alpha than the sequential one only returns different values
+        below the best value, so merging the values in root order, like the
+        sequential search, chooses the same action.
+        """
+        actions = self.move_first(game_state.get_legal_actions(self.index), first_action)
+        value, _ = self.alpha_beta_search(game_state, depth_limit, root_action=actions[0])
+        values = [value]
+        if len(actions) > 1:
+            executor = self.get_executor()
+            self.alpha_channel.value = value
+            time_left = None if self.deadline is None else self.deadline - time.perf_counter()
+            futures = [executor.submit(search_root_action, game_state, action, depth_limit, value, time_left,
+                                       self.game_number)
+                       for action in actions[1:]]
+            for future in concurrent.futures.as_completed(futures):
+                value, reached_horizon = future.result()
+                self.reached_horizon = self.reached_horizon or reached_horizon
+                if value is not None and value > self.alpha_channel.value:
+                    self.alpha_channel.value = value
+            values += [future.result()[0] for future in futures]
+            if None in values:
+                raise SearchTimeout()
+
+        best = 0
+        for index in range(1, len(actions)):
+            if values[index] > values[best]:
+                best = index
+        return actions[best]
+
+    def get_executor(self):
+        """Returns the pool of worker processes, started on first use."""
+        if self.executor is None:
+            self.alpha_channel = multiprocessing.Value('d', 0.0)
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, initializer=init_alpha_beta_worker,
+                initargs=(self.worker_args, self.alpha_channel))
+        return self.executor
+
+# The agent of a worker process of AlphaBetaAgent.parallel_alpha_beta_action
+WORKER_AGENT = None
+
+def init_alpha_beta_worker(agent_args, alpha_channel):
+    global WORKER_AGENT
+    WORKER_AGENT = AlphaBetaAgent(**agent_args)
+    WORKER_AGENT.shared_alpha = alpha_channel
+
+def search_root_action(game_state, action, depth_limit, alpha, time_left, game_number):
+    """
+    Returns the value of Pacman's action in game_state searched above alpha
+    in a worker process, or None if time_left ran out, and whether the
+    search reached its depth.  The worker's transposition table is kept
+    between the moves of game game_number, like the agent's own table.
+    """
+    agent = WORKER_AGENT
+    if agent.game_number != game_number:
+        agent.register_initial_state(game_state)
+        agent.game_number = game_number
+    agent.deadline = None if time_left is None else time.perf_counter() + time_left
+    agent.reached_horizon = False
+    try:
+        value, _ = agent.alpha_beta_search(game_state, depth_limit, root_action=action, alpha=alpha)
+    except SearchTimeout:
+        value = None
+    agent.deadline = None
+    return value, agent.reached_horizon
 
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
       Your expectimax agent (question 4)
     """
 
+    def __init__(self, ghost_model='uniform', samples='0', min_probability='0', **args):
+        super().__init__(**args)
+        # Ghost agent class of ghost_agents.py whose get_distribution models
+        # the ghosts (-a ghost_model=DirectionalGhost), or uniform moves
+        self.ghost_model = None if ghost_model == 'uniform' else getattr(ghost_agents, ghost_model)
+        self.ghost_models = {}
+        # Ghost actions sampled at each chance node, 0 for all (-a samples=N)
+        self.samples = int(samples)
+        # Ghost moves less likely than this from the root are not searched,
+        # but for the likeliest action of each ghost (-a min_probability=P)
+        self.min_probability = float(min_probability)
+        self.random = random.Random(0) # Leaves the game's random state alone
+
     def get_action(self, game_state):
         """
         Returns the expectimax action using self.depth and self.evaluation_function
@@ -293,7 +815,99 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         legal moves.
         """
         "*** YOUR CODE HERE ***"
-        util.raise_not_defined()
+        return self.search_action(game_state, self.expectimax_action)
+
+    def ghost_distribution(self, game_state, agent_index, probability=1.0):
+        """
+        Returns the (action, weight) pairs of the ghost's actions searched in
+        game_state, reached with probability from the root, with weights
+        proportional to the probabilities of the actions.
+
+        Actions are those of the ghost model, with those under
+        min_probability from the root left out, and if there are more than
+        samples of them, samples drawn from their distribution, weighted by
+        how many times they were drawn.
+        """
+        actions = game_state.get_legal_actions(agent_index)
+        if self.ghost_model is None:
+            weights = [1] * len(actions)
+        else:
+            if agent_index not in self.ghost_models:
+                self.ghost_models[agent_index] = self.ghost_model(agent_index)
+            distribution = self.ghost_models[agent_index].get_distribution(game_state)
+            weights = [distribution[action] for action in actions]
+
+        if self.min_probability > 0:
+            threshold = self.min_probability * sum(weights) / probability
+            likeliest = max(weights)
+            kept = [index for index, weight in enumerate(weights) if weight >= threshold or weight == likeliest]
+            actions = [actions[index] for index in kept]
+            weights = [weights[index] for index in kept]
+
+        if 0 < self.samples < len(actions):
+            counts = collections.Counter(self.random.choices(actions, weights, k=self.samples))
+            weights = [counts[action] for action in actions]
+        return [(action, weight) for action, weight in zip(actions, weights) if weight > 0]
+
+    def expectimax_action(self, game_state, depth_limit, first_action=None):
+        """
+        Returns the expectimax action from game_state searched depth_limit
+        plies deep, trying first_action first.
+        """
+        import sys
+
+        num_agents = game_state.get_num_agents()
+        pacman_index = 0
+        INITIAL_DEPTH = 0
+
+        def max_func(game_state, depth, probability):
+            if game_state.is_win() or game_state.is_lose():
+                return self.evaluation_function(game_state), None
+            if depth == depth_limit:
+                self.reached_horizon = True
+                return self.evaluation_function(game_state), None
+            self.check_time()
+
+            actions = game_state.get_legal_actions(pacman_index)
+            if depth == INITIAL_DEPTH:
+                actions = self.move_first(actions, first_action)
+
+            max_score = -sys.maxsize
+            best_action = None
+
+            for action in actions:
+                successor_state = game_state.generate_successor(pacman_index, action)
+                score = exp_func(1, depth, successor_state, probability)
+
+                if score > max_score:
+                    max_score = score
+                    best_action = action
+
+            return max_score, best_action
+
+        def exp_func(agent_index, depth, game_state, probability):
+            if game_state.is_win() or game_state.is_lose():
+                return self.evaluation_function(game_state)
+
+            distribution = self.ghost_distribution(game_state, agent_index, probability)
+            total_weight = sum(weight for _, weight in distribution)
+            total_score = 0
+
+            # The expected score over the ghost's (sampled) actions
+            for action, weight in distribution:
+                successor_state = game_state.generate_successor(agent_index, action)
+                successor_probability = probability * weight / total_weight
+
+                if agent_index == num_agents - 1:
+                    score, _ = max_func(successor_state, depth + 1, successor_probability)
+                else:
+                    score = exp_func(agent_index + 1, depth, successor_state, successor_probability)
+                total_score += weight * score
+
+            return total_score / total_weight
+
+        _, action = max_func(game_state, INITIAL_DEPTH, 1.0)
+        return action
 
 def better_evaluation_function(current_game_state):
     """
@@ -77,8 +77,28 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had get_legal_actions called
+    # static variables keep track of the states generated by generate_successor.
+    # Storing every state in a set keeps them all alive, so by default only the
+    # number of generated successors is counted; see set_explored_tracking
+    EXPLORED_TRACKING_MODES = ('set', 'count', 'off')
+    explored_tracking = 'count'
     explored = set()
+    explored_count = 0
+
+    def set_explored_tracking(mode):
+        """
+        Chooses how generated states are tracked:
+          'set'   - every parent and child state is stored in GameState.explored
+          'count' - only GameState.explored_count is incremented
+          'off'   - nothing is tracked
+        Both the set and the counter are reset.
+        """
+        if mode not in GameState.EXPLORED_TRACKING_MODES:
+            raise Exception('Unknown explored tracking mode: ' + str(mode))
+        GameState.explored_tracking = mode
+        GameState.explored = set()
+        GameState.explored_count = 0
+    set_explored_tracking = staticmethod(set_explored_tracking)
 
     def get_and_reset_explored():
         tmp = GameState.explored.copy()
@@ -86,6 +106,12 @@ class GameState:
         return tmp
     get_and_reset_explored = staticmethod(get_and_reset_explored)
 
+    def get_and_reset_explored_count():
+        tmp = GameState.explored_count
+        GameState.explored_count = 0
+        return tmp
+    get_and_reset_explored_count = staticmethod(get_and_reset_explored_count)
+
     def get_legal_actions(self, agent_index=0):
         """
         Returns the legal actions for the agent specified.
@@ -107,8 +133,10 @@ class GameState:
         if self.is_win() or self.is_lose():
             raise Exception('Can\'t generate a successor of a terminal state.')
 
-        # Copy current state
+        # Copy current state: only the moving agent gets its own AgentState,
+        # everything else is shared with self until it changes
         state = GameState(self)
+        state.data.copy_agent_state(agent_index)
 
         # Let agent's logic deal with its action's effects on the board
         if agent_index == 0:  # Pacman is moving
@@ -129,8 +157,11 @@ class GameState:
         # Bookkeeping
         state.data._agent_moved = agent_index
         state.data.score += state.data.score_change
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.explored_tracking != 'off':
+            GameState.explored_count += 1
+            if GameState.explored_tracking == 'set':
+                GameState.explored.add(self)
+                GameState.explored.add(state)
         return state
 
     def get_legal_pacman_actions(self):
@@ -288,6 +319,10 @@ class ClassicGameRules:
         init_state = GameState()
         init_state.initialize(layout, len(ghost_agents))
         game = Game(agents, display, self, catch_exceptions=catch_exceptions)
+        # Agents that budget their own time per move are told the limit
+        for index, agent in enumerate(agents):
+            if 'set_move_timeout' in dir(agent):
+                agent.set_move_timeout(self.get_move_timeout(index))
         game.state = init_state
         self.initial_state = init_state.deep_copy()
         self.quiet = quiet
@@ -389,11 +424,12 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if position in state.get_capsules():
+            state.data.capsules = state.data.capsules[:]
             state.data.capsules.remove(position)
             state.data._capsule_eaten = position
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agent_states)):
-                state.data.agent_states[index].scared_timer = SCARED_TIME
+                state.data.copy_agent_state(index).scared_timer = SCARED_TIME
     consume = staticmethod(consume)
 
 
@@ -460,9 +496,11 @@ class GhostRules:
     def collide(state, ghost_state, agent_index):
         if ghost_state.scared_timer > 0:
             state.data.score_change += 200
+            ghost_state = state.data.copy_agent_state(agent_index)
             GhostRules.place_ghost(state, ghost_state)
             ghost_state.scared_timer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agent_index] = True
         else:
             if not state.data._win:
@@ -554,6 +592,8 @@ def read_command(argv):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--explored', dest='explored', type='choice', choices=GameState.EXPLORED_TRACKING_MODES,
+                      help=default('How generated states are tracked: set, count or off'), default='count')
 
     options, other_junk = parser.parse_args(argv)
     if len(other_junk) != 0:
@@ -564,6 +604,9 @@ def read_command(argv):
     if options.fix_random_seed:
         random.seed('cs188')
 
+    # Choose how generated states are tracked
+    GameState.set_explored_tracking(options.explored)
+
     # Choose a layout
     args['layout'] = layout.get_layout(options.layout)
     if args['layout'] is None:
@@ -15,6 +15,8 @@
 """Feature extractors for Pacman game states"""
 
 from game import Directions, Actions
+import heapq
+import collections
 import util
 
 class FeatureExtractor:
@@ -41,27 +43,144 @@ class CoordinateExtractor(FeatureExtractor):
         feats['action=%s' % action] = 1.0
         return feats
 
+class FoodDistanceField:
+    """
+    The maze distance from every open cell to its nearest food, and the
+    direction of the first step towards it, computed for all cells at once
+    by a breadth first search started from every food cell.
+
+    Distances are read in O(1).  When food is eaten, only the cells whose
+    nearest food it was are searched again; for_food keeps the field of the
+    last food grid it was asked about and updates it that way, so that the
+    successive states of a game share one field.
+    """
+    _last = None # The field of the previous for_food call
+
+    def __init__(self, walls, food):
+        self.walls = walls
+        self.width, self.height = walls.width, walls.height
+        # The open neighbors of each cell, as (neighbor index, direction to it)
+        self.neighbors = [[] for i in range(self.width * self.height)]
+        for x in range(self.width):
+            for y in range(self.height):
+                if walls[x][y]: continue
+                for direction in (Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST):
+                    dx, dy = Actions.direction_to_vector(direction)
+                    next_x, next_y = int(x + dx), int(y + dy)
+                    if 0 <= next_x < self.width and 0 <= next_y < self.height and not walls[next_x][next_y]:
+                        self.neighbors[x * self.height + y].append((next_x * self.height + next_y, direction))
+        self.compute(food)
+
+    def compute(self, food):
+        """Fills the field from scratch for a food grid."""
+        self.food = food.copy()
+        self.food_source = food
+        self.distances = [None] * (self.width * self.height)
+        self.directions = [Directions.STOP] * (self.width * self.height)
+        frontier = collections.deque()
+        for x, y in food.as_list():
+            self.distances[x * self.height + y] = 0
+            frontier.append(x * self.height + y)
+        while frontier:
+            cell = frontier.popleft()
+            for neighbor, direction in self.neighbors[cell]:
+                if self.distances[neighbor] is None:
+                    self.distances[neighbor] = self.distances[cell] + 1
+                    self.directions[neighbor] = Directions.REVERSE[direction]
+                    frontier.append(neighbor)
+
+    def remove_food(self, pos):
+        """Updates the field after the food at pos was eaten."""
+        x, y = pos
+        self.food[x][y] = False
+        start = x * self.height + y
+        if self.distances[start] != 0: return
+
+        # The cells for which pos was a nearest food: distance k from pos and k from the food
+        affected = {start}
+        frontier = [start]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for cell in frontier:
+                for neighbor, direction in self.neighbors[cell]:
+                    if neighbor not in affected and self.distances[neighbor] == depth:
+                        affected.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        # Search them again from the unaffected cells around them, in order of distance
+        heap = []
+        for cell in affected:
+            self.distances[cell] = None
+            self.directions[cell] = Directions.STOP
+            for neighbor, direction in self.neighbors[cell]:
+                if neighbor not in affected and self.distances[neighbor] is not None:
+                    heap.append((self.distances[neighbor] + 1, cell, direction))
+        heapq.heapify(heap)
+        while heap:
+            distance, cell, direction = heapq.heappop(heap)
+            if self.distances[cell] is not None: continue
+            self.distances[cell] = distance
+            self.directions[cell] = direction
+            for neighbor, neighbor_direction in self.neighbors[cell]:
+                if self.distances[neighbor] is None:
+                    heapq.heappush(heap, (distance + 1, neighbor, Directions.REVERSE[neighbor_direction]))
+
+    def update(self, food):
+        """Updates the field to a new food grid, incrementally if food was only eaten."""
+        if food is self.food_source: return
+        if food != self.food:
+            eaten, added = [], False
+            for x in range(self.width):
+                for y in range(self.height):
+                    if food[x][y] != self.food[x][y]:
+                        if food[x][y]: added = True
+                        else: eaten.append((x, y))
+            if added:
+                self.compute(food)
+                return
+            for pos in eaten:
+                self.remove_food(pos)
+        self.food_source = food
+
+    def distance(self, pos):
+        """Returns the maze distance from pos to the nearest food, or None if there is none."""
+        return self.distances[int(pos[0]) * self.height + int(pos[1])]
+
+    def direction(self, pos):
+        """Returns the first step from pos towards the nearest food (STOP on food or if there is none)."""
+        return self.directions[int(pos[0]) * self.height + int(pos[1])]
+
+    def path(self, pos):
+        """Returns the actions of a shortest path from pos to the nearest food ([] if there is none)."""
+        path = []
+        x, y = int(pos[0]), int(pos[1])
+        while self.distances[x * self.height + y]:
+            direction = self.directions[x * self.height + y]
+            dx, dy = Actions.direction_to_vector(direction)
+            x, y = int(x + dx), int(y + dy)
+            path.append(direction)
+        return path
+
+    @staticmethod
+    def for_food(walls, food):
+        """Returns the field of a food grid, updated from the previous one when the walls are the same."""
+        field = FoodDistanceField._last
+        if field is None or field.walls is not walls:
+            field = FoodDistanceField._last = FoodDistanceField(walls, food)
+        else:
+            field.update(food)
+        return field
+
 def closest_food(pos, food, walls):
     """
     closest_food -- this is similar to the function that we have
-    worked on in the search project; here its all in one place
+    worked on in the search project; the distances now come from the
+    FoodDistanceField of the food, shared by all calls for the same food
     """
-    fringe = [(pos[0], pos[1], 0)]
-    expanded = set()
-    while fringe:
-        pos_x, pos_y, dist = fringe.pop(0)
-        if (pos_x, pos_y) in expanded:
-            continue
-        expanded.add((pos_x, pos_y))
-        # if we find a food at this location then exit
-        if food[pos_x][pos_y]:
-            return dist
-        # otherwise spread out from the location to its neighbours
-        neighbors = Actions.get_legal_neighbors((pos_x, pos_y), walls)
-        for nbr_x, nbr_y in neighbors:
-            fringe.append((nbr_x, nbr_y, dist+1))
-    # no food found
-    return None
+    return FoodDistanceField.for_food(walls, food).distance(pos)
 
 class SimpleExtractor(FeatureExtractor):
     """
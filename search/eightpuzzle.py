@@ -14,6 +14,12 @@
 
 import search
 import random
+import collections
+import mmap
+import os
+from array import array
+
+PATTERN_DATABASE_CACHE = {}
 
 # Module Classes
 
@@ -196,7 +202,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def get_start_state(self):
-        return puzzle
+        return self.puzzle
 
     def is_goal_state(self, state):
         return state.is_goal()
@@ -221,6 +227,202 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+def pack_puzzle(numbers):
+    """
+      Packs a puzzle, given as in EightPuzzleState, into an int: the tile of
+    cell i (row * size + col) takes the 4 bits above bit 4 * (i + 1) and the
+    lowest 4 bits hold the cell of the blank.
+
+    >>> pack_puzzle([1, 0, 2, 3]) == 1 | 1 << 4 | 2 << 12 | 3 << 16
+    True
+    """
+    packed = numbers.index(0)
+    for cell, tile in enumerate(numbers):
+        packed |= tile << 4 * (cell + 1)
+    return packed
+
+def unpack_puzzle(packed, size=3):
+    """
+      Returns the list of numbers of a packed puzzle.
+
+    >>> unpack_puzzle(pack_puzzle([1, 0, 2, 3]), 2)
+    [1, 0, 2, 3]
+    """
+    return [packed >> 4 * (cell + 1) & 15 for cell in range(size * size)]
+
+class SlidingPuzzleSearchProblem(search.SearchProblem):
+    """
+      The Eight Puzzle, or any size x size sliding puzzle up to the Fifteen
+    Puzzle, with packed int states (see pack_puzzle), so that successors are
+    a few bit operations and states hash as ints.  Actions move the blank,
+    as in EightPuzzleState, and the goal has tile i in cell i.
+
+    pattern_database_heuristic solves it with the disjoint pattern
+    databases listed in patterns (DEFAULT_PATTERNS for the size by default),
+    loaded from and saved to pattern_dir when it is given.
+    """
+    def __init__(self, numbers, size=3, patterns=None, pattern_dir=None):
+        self.size = size
+        self.start = pack_puzzle(list(numbers))
+        self.goal = pack_puzzle(list(range(size * size)))
+        self.patterns = patterns if patterns is not None else DEFAULT_PATTERNS[size]
+        self.pattern_dir = pattern_dir
+        self.heuristic_info = {}
+        self._expanded = 0
+
+        # The moves of the blank from each cell, as (action, next blank cell)
+        self.moves = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            moves = []
+            if row != 0: moves.append(('up', cell - size))
+            if row != size - 1: moves.append(('down', cell + size))
+            if col != 0: moves.append(('left', cell - 1))
+            if col != size - 1: moves.append(('right', cell + 1))
+            self.moves.append(moves)
+
+    def get_start_state(self):
+        return self.start
+
+    def is_goal_state(self, state):
+        return state == self.goal
+
+    def get_successors(self, state):
+        """
+          Returns list of (successor, action, stepCost) pairs for every legal
+        move of the blank, at a cost of 1 each
+        """
+        self._expanded += 1
+        blank = state & 15
+        successors = []
+        for action, cell in self.moves[blank]:
+            shift = 4 * (cell + 1)
+            tile = state >> shift & 15
+            successor = state - (tile << shift) + (tile << 4 * (blank + 1)) - blank + cell
+            successors.append((successor, action, 1))
+        return successors
+
+    def get_cost_of_actions(self, actions):
+        return len(actions)
+
+# Tile groups of the disjoint pattern databases, by puzzle size
+DEFAULT_PATTERNS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)),
+}
+
+class PatternDatabase:
+    """
+      The number of moves of a group of tiles needed to bring them to their
+    goal cells, ignoring the other tiles, for every placement of the group.
+
+    Only moves of the group's own tiles are counted, so that the values of
+    databases over disjoint groups add up to an admissible heuristic.  The
+    table is filled by a backwards breadth first search from the goal (0-1
+    BFS, as moving the blank over other tiles is free) and holds one byte
+    per placement of the group and the blank, indexed by the sum of
+    position(tiles[i]) * cells ** (i + 1) plus the blank's cell.  Keeping
+    the blank makes the sum consistent: the group's tiles can wall the
+    blank off, and the minimum over all blank cells may drop by more than
+    one in a single move, which makes A* return longer paths.
+    Tables are saved as raw array('B') files and memory-mapped when loaded.
+    """
+    def __init__(self, size, tiles, table):
+        self.size = size
+        self.tiles = tuple(tiles)
+        self.table = table
+
+    def value(self, positions):
+        """Returns the table entry of a list of the positions of all tiles (0 being the blank)."""
+        cells = self.size * self.size
+        index = 0
+        for tile in reversed(self.tiles):
+            index = index * cells + positions[tile]
+        return self.table[index * cells + positions[0]]
+
+    @staticmethod
+    def build(size, tiles):
+        cells = size * size
+        k = len(tiles)
+        goal = tuple(tiles) # Tile t starts in cell t
+
+        def index(positions):
+            result = 0
+            for position in reversed(positions):
+                result = result * cells + position
+            return result
+
+        # Distances of placements of the group together with the blank's cell
+        # (255 where the blank would sit on a tile of the group)
+        distances = array('B', [255]) * (cells ** k * cells)
+        distances[index(goal) * cells] = 0
+        frontier = collections.deque([(goal, 0, 0)])
+        while frontier:
+            positions, blank, distance = frontier.popleft()
+            if distance > distances[index(positions) * cells + blank]:
+                continue
+            row, col = divmod(blank, size)
+            for cell in (blank - size if row != 0 else -1, blank + size if row != size - 1 else -1,
+                         blank - 1 if col != 0 else -1, blank + 1 if col != size - 1 else -1):
+                if cell < 0: continue
+                if cell in positions:
+                    moved = tuple(blank if position == cell else position for position in positions)
+                    next_distance = distance + 1
+                else:
+                    moved = positions
+                    next_distance = distance
+                next_index = index(moved) * cells + cell
+                if next_distance < distances[next_index]:
+                    distances[next_index] = next_distance
+                    if next_distance == distance:
+                        frontier.appendleft((moved, cell, next_distance))
+                    else:
+                        frontier.append((moved, cell, next_distance))
+        return PatternDatabase(size, tiles, distances)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            array('B', self.table).tofile(f)
+
+    @staticmethod
+    def load(size, tiles, path):
+        with open(path, 'rb') as f:
+            return PatternDatabase(size, tiles, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def for_pattern(size, tiles, pattern_dir=None):
+        """
+          Returns the database of a group of tiles, building it only the first
+        time it is asked for.  If pattern_dir is given, databases are also
+        loaded from (and saved to) files in that directory.
+        """
+        key = (size, tuple(tiles))
+        if key not in PATTERN_DATABASE_CACHE:
+            path = None
+            if pattern_dir is not None:
+                path = os.path.join(pattern_dir, 'pattern-%d-%s-blank.bin' % (size, '-'.join(map(str, tiles))))
+            if path is not None and os.path.exists(path):
+                PATTERN_DATABASE_CACHE[key] = PatternDatabase.load(size, tiles, path)
+            else:
+                PATTERN_DATABASE_CACHE[key] = PatternDatabase.build(size, tiles)
+                if path is not None:
+                    os.makedirs(pattern_dir, exist_ok=True)
+                    PATTERN_DATABASE_CACHE[key].save(path)
+        return PATTERN_DATABASE_CACHE[key]
+
+def pattern_database_heuristic(state, problem):
+    """
+      The sum of the disjoint pattern databases of a
+    SlidingPuzzleSearchProblem, for its packed int states.
+    """
+    if 'pattern_databases' not in problem.heuristic_info:
+        problem.heuristic_info['pattern_databases'] = [PatternDatabase.for_pattern(problem.size, tiles, problem.pattern_dir)
+                                                       for tiles in problem.patterns]
+    positions = [0] * (problem.size * problem.size)
+    for cell in range(problem.size * problem.size):
+        positions[state >> 4 * (cell + 1) & 15] = cell
+    return sum(database.value(positions) for database in problem.heuristic_info['pattern_databases'])
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -262,6 +464,22 @@ def create_random_eight_puzzle(moves=100):
         puzzle = puzzle.result(random.sample(puzzle.legal_moves(), 1)[0])
     return puzzle
 
+def create_random_sliding_puzzle(size=4, moves=100):
+    """
+      Returns the numbers of a random size x size puzzle, made by applying
+    'moves' random moves of the blank to a solved puzzle.
+    """
+    numbers = list(range(size * size))
+    blank = 0
+    for i in range(moves):
+        row, col = divmod(blank, size)
+        cells = [cell for cell, legal in ((blank - size, row != 0), (blank + size, row != size - 1),
+                                          (blank - 1, col != 0), (blank + 1, col != size - 1)) if legal]
+        cell = random.choice(cells)
+        numbers[blank], numbers[cell] = numbers[cell], 0
+        blank = cell
+    return numbers
+
 if __name__ == '__main__':
     puzzle = create_random_eight_puzzle(25)
     print('A random puzzle:')
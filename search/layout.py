@@ -14,10 +14,18 @@
 
 from util import manhattan_distance
 from game import Grid
+from game import BitGrid
+from game import Actions
+from game import Directions
+from array import array
+import hashlib
 import os
+import pickle
 import random
 
 VISIBILITY_MATRIX_CACHE = {}
+MAZE_DISTANCE_CACHE = {}
+JUNCTION_GRAPH_CACHE = {}
 
 class Layout:
     """
@@ -28,7 +36,7 @@ class Layout:
         self.width = len(layout_text[0])
         self.height= len(layout_text)
         self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        self.food = BitGrid(self.width, self.height, False)
         self.capsules = []
         self.agent_positions = []
         self.num_ghosts = 0
@@ -64,6 +72,20 @@ class Layout:
             #self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str_param.__add__, self.layout_text)]
             self.visibility = VISIBILITY_MATRIX_CACHE[self.layout_text.__str__()]
 
+    def get_maze_distances(self, cache_dir=None):
+        """
+        Returns the MazeDistanceOracle of this layout's walls (see
+        MazeDistanceOracle.for_walls).
+        """
+        return MazeDistanceOracle.for_walls(self.walls, cache_dir)
+
+    def get_junction_graph(self):
+        """
+        Returns the JunctionGraph of this layout's walls (see
+        JunctionGraph.for_walls).
+        """
+        return JunctionGraph.for_walls(self.walls)
+
     def is_wall(self, pos):
         x, col = pos
         return self.walls[x][col]
@@ -131,6 +153,180 @@ class Layout:
         elif layout_char in  ['1', '2', '3', '4']:
             self.agent_positions.append((int(layout_char), (x, y)))
             self.num_ghosts += 1
+class MazeDistanceOracle:
+    """
+    All-pairs maze distances between the open cells of a walls Grid.
+
+    Every open cell gets an id, and a breadth first search from each of them
+    fills a flat array of unsigned shorts, so that distance(p1, p2) is two
+    array reads.  Oracles are built once per wall layout: for_walls caches
+    them by the text of the walls and can also persist them to disk.
+    """
+    UNREACHABLE = 0xFFFF
+    _last = (None, None) # (walls, oracle) of the previous for_walls call
+
+    def __init__(self, walls):
+        self.width = walls.width
+        self.height = walls.height
+        self.cells = [(x, y) for x in range(self.width) for y in range(self.height) if not walls[x][y]]
+        self.cell_ids = array('i', [-1]) * (self.width * self.height)
+        for cell_id, (x, y) in enumerate(self.cells):
+            self.cell_ids[x * self.height + y] = cell_id
+        self.distances = self._compute_distances()
+
+    def _neighbor_ids(self):
+        height, cell_ids = self.height, self.cell_ids
+        neighbors = []
+        for x, y in self.cells:
+            adjacent = []
+            for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if 0 <= nx < self.width and 0 <= ny < height and cell_ids[nx * height + ny] >= 0:
+                    adjacent.append(cell_ids[nx * height + ny])
+            neighbors.append(adjacent)
+        return neighbors
+
+    def _compute_distances(self):
+        n = len(self.cells)
+        neighbors = self._neighbor_ids()
+        distances = array('H', [self.UNREACHABLE]) * (n * n)
+        for source in range(n):
+            row = [self.UNREACHABLE] * n
+            row[source] = 0
+            frontier = [source]
+            depth = 0
+            while frontier:
+                depth += 1
+                next_frontier = []
+                for cell_id in frontier:
+                    for neighbor in neighbors[cell_id]:
+                        if row[neighbor] == self.UNREACHABLE:
+                            row[neighbor] = depth
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            distances[source * n:(source + 1) * n] = array('H', row)
+        return distances
+
+    def cell_id(self, pos):
+        """Returns the id of the open cell at pos, or -1 for walls."""
+        x, y = pos
+        return self.cell_ids[int(x) * self.height + int(y)]
+
+    def distance(self, pos1, pos2):
+        """
+        Returns the maze distance between two open cells, or UNREACHABLE if
+        there is no path between them.
+        """
+        return self.distances[self.cell_id(pos1) * len(self.cells) + self.cell_id(pos2)]
+
+    def distances_from(self, pos):
+        """Returns an array with the distances from pos to every cell id."""
+        n = len(self.cells)
+        start = self.cell_id(pos) * n
+        return self.distances[start:start + n]
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def for_walls(walls, cache_dir=None):
+        """
+        Returns the oracle for a walls Grid, building it only the first time
+        a given wall layout is seen.  If cache_dir is given, oracles are also
+        loaded from (and saved to) files in that directory.
+        """
+        last_walls, last_oracle = MazeDistanceOracle._last
+        if walls is last_walls: return last_oracle
+        key = str(walls)
+        if key not in MAZE_DISTANCE_CACHE:
+            path = None
+            if cache_dir is not None:
+                path = os.path.join(cache_dir, 'maze-distances-%s.pkl' % hashlib.sha1(key.encode()).hexdigest())
+            if path is not None and os.path.exists(path):
+                MAZE_DISTANCE_CACHE[key] = MazeDistanceOracle.load(path)
+            else:
+                MAZE_DISTANCE_CACHE[key] = MazeDistanceOracle(walls)
+                if path is not None:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    MAZE_DISTANCE_CACHE[key].save(path)
+        MazeDistanceOracle._last = (walls, MAZE_DISTANCE_CACHE[key])
+        return MAZE_DISTANCE_CACHE[key]
+
+class JunctionGraph:
+    """
+    The open cells of a walls Grid with their corridors compressed away.
+
+    Junctions, the cells that do not have exactly two open neighbors
+    (intersections and dead ends), are the nodes of the graph.  Each run of
+    two-neighbor corridor cells leaving a junction becomes an edge to the
+    junction at its other end, carrying the actions that walk it; its cost
+    is the number of actions.
+    """
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.junctions = set()
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if not walls[x][y] and len(self.open_directions((x, y))) != 2:
+                    self.junctions.add((x, y))
+        self.edges = {} # Position -> [(end, actions)], filled for junctions first
+        for junction in self.junctions:
+            self.edges[junction] = [self.walk(junction, direction) for direction in self.open_directions(junction)]
+
+    def open_directions(self, pos):
+        """Returns the directions of the open neighbors of pos."""
+        x, y = pos
+        directions = []
+        for direction in (Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST):
+            dx, dy = Actions.direction_to_vector(direction)
+            next_x, next_y = int(x + dx), int(y + dy)
+            if 0 <= next_x < self.walls.width and 0 <= next_y < self.walls.height and not self.walls[next_x][next_y]:
+                directions.append(direction)
+        return directions
+
+    def walk(self, pos, direction):
+        """
+        Follows the corridor that leaves pos in direction up to the next
+        junction (or back to pos, for a loop without junctions) and returns
+        (end, actions).
+        """
+        actions = [direction]
+        x, y = pos
+        while True:
+            dx, dy = Actions.direction_to_vector(direction)
+            x, y = int(x + dx), int(y + dy)
+            if (x, y) in self.junctions or (x, y) == pos:
+                return (x, y), tuple(actions)
+            reverse = Directions.REVERSE[direction]
+            direction = [d for d in self.open_directions((x, y)) if d != reverse][0]
+            actions.append(direction)
+
+    def edges_from(self, pos):
+        """
+        Returns the (end, actions) edges leaving pos.  For a cell inside a
+        corridor, these are the walks to both ends of the corridor.
+        """
+        if pos not in self.edges:
+            self.edges[pos] = [self.walk(pos, direction) for direction in self.open_directions(pos)]
+        return self.edges[pos]
+
+    @staticmethod
+    def for_walls(walls):
+        """
+        Returns the graph of a walls Grid, building it only the first time a
+        given wall layout is seen.
+        """
+        key = str(walls)
+        if key not in JUNCTION_GRAPH_CACHE:
+            JUNCTION_GRAPH_CACHE[key] = JunctionGraph(walls)
+        return JUNCTION_GRAPH_CACHE[key]
+
 def get_layout(name, back = 2):
     if name.endswith('.lay'):
         layout = try_to_load('layouts/' + name)
@@ -18,6 +18,11 @@ Pacman agents (in search_agents.py).
 """
 import util
 import pdb
+import collections
+import concurrent.futures
+import os
+import time
+from game import Actions
 
 class SearchProblem:
     """
@@ -61,6 +66,98 @@ class SearchProblem:
         """
         util.raise_not_defined()
 
+    def get_predecessors(self, state):
+        """
+          state: Search state
+
+        The reverse of get_successors, used by the bidirectional searches: it
+        returns a list of triples, (predecessor, action, stepCost), where
+        taking 'action' in 'predecessor' leads to 'state' at cost 'stepCost'.
+
+        The default implementation covers grid problems whose states are (x,y)
+        positions in self.walls: every legal neighbor is a predecessor, and
+        the step cost is self.cost_fn(state) if the problem has a cost_fn.
+        """
+        cost = getattr(self, 'cost_fn', lambda pos: 1)(state)
+        predecessors = []
+        for neighbor in Actions.get_legal_neighbors(state, self.walls):
+            if neighbor == state: continue
+            action = Actions.vector_to_direction((state[0] - neighbor[0], state[1] - neighbor[1]))
+            predecessors.append((neighbor, action, cost))
+        return predecessors
+
+    def split_state(self, state):
+        """
+          state: Search state
+
+        Returns the pair (position, rest), where position is Pacman's (x,y)
+        position in state and rest is everything else, used by
+        JunctionSearchProblem.  The default implementation is for problems
+        whose states are positions.
+        """
+        return state, None
+
+    def get_jump_successors(self, state, action):
+        """
+          state: Search state
+          action: The action that reached state, None for the start state
+
+        The successor function of jump_point_search: it returns a list of
+        triples, (jump_point, action, distance), where 'jump_point' is
+        reached by repeating 'action' 'distance' times.
+
+        The default implementation covers grid problems whose states are (x,y)
+        positions in self.walls and whose moves all cost 1; any cost_fn is
+        ignored.  Paths are kept canonical (horizontal moves only turn where a
+        wall forces them to, vertical moves may turn anywhere), so a jump
+        stops only at goal states, at cells whose turns are forced, and, when
+        moving vertically, at cells from which a horizontal jump stops.
+        """
+        walls = self.walls
+
+        def is_open(x, y):
+            return 0 <= x < walls.width and 0 <= y < walls.height and not walls[x][y]
+
+        def jump_horizontally(x, y, dx):
+            while True:
+                x += dx
+                if not is_open(x, y): return None
+                if self.is_goal_state((x, y)): return (x, y)
+                if ((is_open(x, y + 1) and not is_open(x - dx, y + 1)) or
+                        (is_open(x, y - 1) and not is_open(x - dx, y - 1))):
+                    return (x, y)
+
+        def jump_vertically(x, y, dy):
+            while True:
+                y += dy
+                if not is_open(x, y): return None
+                if self.is_goal_state((x, y)): return (x, y)
+                if jump_horizontally(x, y, 1) is not None or jump_horizontally(x, y, -1) is not None:
+                    return (x, y)
+
+        x, y = state
+        if action is None:
+            vectors = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        else:
+            dx, dy = Actions.direction_to_vector(action)
+            dx, dy = int(dx), int(dy)
+            if dx == 0:
+                vectors = [(0, dy), (1, 0), (-1, 0)]
+            else:
+                vectors = [(dx, 0)] + [(0, side) for side in (1, -1)
+                                       if is_open(x, y + side) and not is_open(x - dx, y + side)]
+
+        successors = []
+        for dx, dy in vectors:
+            if dx == 0:
+                jump_point = jump_vertically(x, y, dy)
+            else:
+                jump_point = jump_horizontally(x, y, dx)
+            if jump_point is not None:
+                distance = abs(jump_point[0] - x) + abs(jump_point[1] - y)
+                successors.append((jump_point, Actions.vector_to_direction((dx, dy)), distance))
+        return successors
+
 
 def tiny_maze_search(problem):
     """
@@ -75,6 +172,10 @@ def tiny_maze_search(problem):
 # def addSuccessors(problem, addCost=True):
 
 class SearchNode:
+    # Searches create one node per generated successor, so nodes only keep a
+    # pointer to their parent and the path is rebuilt once, by get_path()
+    __slots__ = ('__state', 'action', 'cost', 'parent')
+
     def __init__(self, parent, node_info):
         """
             parent: parent SearchNode.
@@ -137,21 +238,20 @@ def depth_first_search(problem):
     
     expanded_nodes = set() # We use a set as it is faster to search presence of an element
     frontier = util.Stack()
-    start_state = (problem.get_start_state(), [], 0)
-    frontier.push(start_state)
+    frontier.push(SearchNode(None, (problem.get_start_state(), None, 0)))
     
     while not frontier.is_empty():
-        current_state, path, cost = frontier.pop()
-        expanded_nodes.add(current_state)
+        node = frontier.pop()
+        expanded_nodes.add(node.state)
         
-        if problem.is_goal_state(current_state):
-            return path
+        if problem.is_goal_state(node.state):
+            return node.get_path()
             
-        for successor_state, action, successor_cost in problem.get_successors(current_state):
-            if (not frontier.contains(successor_state)) and (successor_state not in expanded_nodes):
-                frontier.push((successor_state, path + [action], cost + successor_cost)) # Instead of using get_path() function
-                # we add in each iteration the accumulated path plus the current successor node action, so when we reach solution we 
-                # already have the full path
+        for successor in problem.get_successors(node.state):
+            # States already in the frontier are pushed again, so that the deepest copy is expanded first
+            if successor[0] not in expanded_nodes:
+                frontier.push(SearchNode(node, successor)) # Each node only points to its parent, and the full
+                # path is rebuilt with get_path() once we reach the solution
     
     return []
 
@@ -159,21 +259,19 @@ def breadth_first_search(problem):
     """Search the shallowest nodes in the search tree first."""
     "*** YOUR CODE HERE ***"
     expanded_nodes = set()
-    frontier = util.Queue()
-    start_state = (problem.get_start_state(), [], 0)
-    frontier.push(start_state)
+    frontier = util.Queue(key=lambda node: node.state)
+    frontier.push(SearchNode(None, (problem.get_start_state(), None, 0)))
     
     while not frontier.is_empty():
-        current_state, path, cost = frontier.pop()
-        expanded_nodes.add(current_state)
+        node = frontier.pop()
+        expanded_nodes.add(node.state)
         
-        if problem.is_goal_state(current_state):
-            return path
+        if problem.is_goal_state(node.state):
+            return node.get_path()
             
-        for successor_state, action, successor_cost in problem.get_successors(current_state):
-            frontier_coords = [coord for coord, _, _ in frontier.list]
-            if (successor_state not in frontier_coords) and (successor_state not in expanded_nodes):
-                frontier.push((successor_state, path + [action], cost + successor_cost))
+        for successor in problem.get_successors(node.state):
+            if (not frontier.contains(successor[0])) and (successor[0] not in expanded_nodes):
+                frontier.push(SearchNode(node, successor))
     
     return []
 
@@ -181,26 +279,21 @@ def uniform_cost_search(problem):
     """Search the node of least total cost first."""
     "*** YOUR CODE HERE ***"
     expanded_nodes = set()
-    frontier = util.PriorityQueue()
-    start_state = (problem.get_start_state(), [], 0)
-    frontier.push(start_state, 0)
+    frontier = util.IndexedPriorityQueue(key=lambda node: node.state) # Each state is queued at most once
+    frontier.push(SearchNode(None, (problem.get_start_state(), None, 0)), 0)
     
     while not frontier.is_empty():
-        current_state, path, cost = frontier.pop()
-        
-        if current_state in expanded_nodes: # We check if current_state was previously expanded, and if it was we discard it as
-            # now it must have a greater cost
-            continue
+        node = frontier.pop()
+        expanded_nodes.add(node.state)
         
-        expanded_nodes.add(current_state)
-        
-        if problem.is_goal_state(current_state):
-            return path
+        if problem.is_goal_state(node.state):
+            return node.get_path()
             
-        for successor_state, action, successor_cost in problem.get_successors(current_state): 
-            if (successor_state not in expanded_nodes):
-                priority =  cost + successor_cost             
-                frontier.push((successor_state, path + [action], cost + successor_cost), priority)
+        for successor in problem.get_successors(node.state): 
+            if (successor[0] not in expanded_nodes):
+                successor_node = SearchNode(node, successor)
+                # If the state is already in the frontier with a greater cost, its node is replaced
+                frontier.update(successor_node, successor_node.cost)
     
     return []
 
@@ -211,34 +304,620 @@ def null_heuristic(state, problem=None):
     """
     return 0
 
+class HeuristicCache:
+    """
+    Wraps a heuristic with a bounded LRU cache (util.LRUCache) of its values
+    by state, so that a state pushed several times is only evaluated once.
+    The cache, with its hit and miss counts, is cleared whenever it is
+    called with a different problem.
+    """
+    def __init__(self, heuristic, max_size=100000):
+        self.heuristic = heuristic
+        self.cache = util.LRUCache(max_size)
+        self.problem = None
+
+    def __call__(self, state, problem=None):
+        if problem is not self.problem:
+            self.cache.clear()
+            self.problem = problem
+        value = self.cache.get(state)
+        if value is None:
+            value = self.heuristic(state, problem)
+            self.cache.put(state, value)
+        return value
+
 def a_star_search(problem, heuristic=null_heuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
     expanded_nodes = set()
-    frontier = util.PriorityQueue()
-    start_state = (problem.get_start_state(), [], 0)
-    frontier.push(start_state, 0)
+    frontier = util.IndexedPriorityQueue(key=lambda node: node.state)
+    frontier.push(SearchNode(None, (problem.get_start_state(), None, 0)), 0)
     
     while not frontier.is_empty():
-        current_state, path, cost = frontier.pop()
-        
-        if current_state in expanded_nodes:
-            continue
+        node = frontier.pop()
+        expanded_nodes.add(node.state)
         
-        expanded_nodes.add(current_state)
-        
-        if problem.is_goal_state(current_state):
-            return path
+        if problem.is_goal_state(node.state):
+            return node.get_path()
             
-        for successor_state, action, successor_cost in problem.get_successors(current_state): 
-            if (successor_state not in expanded_nodes):
-                priority = cost + successor_cost + heuristic(successor_state, problem)             
-                frontier.push((successor_state, path + [action], cost + successor_cost), priority)
+        for successor in problem.get_successors(node.state): 
+            if (successor[0] not in expanded_nodes):
+                successor_node = SearchNode(node, successor)
+                priority = successor_node.cost + heuristic(successor_node.state, problem)
+                frontier.update(successor_node, priority)
     
     return []
 
+def jump_point_search(problem, heuristic=null_heuristic):
+    """
+    Jump Point Search: A* over the jump points of a 4-connected grid with
+    uniform step costs (see SearchProblem.get_jump_successors).  Symmetric
+    paths are pruned and corridors are crossed in a single jump, so only the
+    cells where an optimal path may turn are expanded.  The returned path is
+    optimal, with the same cost as the one of a_star_search.
+    """
+    expanded_nodes = set()
+    frontier = util.IndexedPriorityQueue(key=lambda node: (node.state, node.action))
+    frontier.push(SearchNode(None, (problem.get_start_state(), None, 0)), 0)
+
+    while not frontier.is_empty():
+        node = frontier.pop()
+        expanded_nodes.add((node.state, node.action))
+
+        if problem.is_goal_state(node.state):
+            path = []
+            while node.parent is not None:
+                path.extend([node.action] * (node.cost - node.parent.cost))
+                node = node.parent
+            path.reverse()
+            return path
+
+        for successor in problem.get_jump_successors(node.state, node.action):
+            if (successor[0], successor[1]) not in expanded_nodes:
+                successor_node = SearchNode(node, successor)
+                priority = successor_node.cost + heuristic(successor_node.state, problem)
+                frontier.update(successor_node, priority)
+
+    return []
+
+class ReverseSearchProblem(SearchProblem):
+    """
+    The backward view of a single goal problem (one with a 'goal' state),
+    searched from the goal towards the start with get_predecessors.  Its own
+    'goal' is the start state, so heuristics that estimate the distance to
+    problem.goal, like manhattan_heuristic, work in both directions.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.get_start_state()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def get_start_state(self):
+        return self.problem.goal
+
+    def is_goal_state(self, state):
+        return state == self.goal
+
+    def get_successors(self, state):
+        return self.problem.get_predecessors(state)
+
+    def get_predecessors(self, state):
+        return self.problem.get_successors(state)
+
+class JunctionSearchProblem(SearchProblem):
+    """
+    Searches a grid problem along the edges of a JunctionGraph (layout.py) of
+    its walls: the successors of a state are the states at the ends of the
+    corridors leaving its position, reached with all the corridor's actions
+    at once and at the summed step costs.
+
+    A corridor walk stops early at goal states and wherever the part of the
+    state other than the position changes (see SearchProblem.split_state),
+    e.g. when food is eaten, since those are the only cells of a corridor
+    where turning around can pay off.  Searches return paths of action
+    tuples, which expand_path turns back into primitive Directions.  Any
+    other attribute is looked up in the wrapped problem.
+
+    The grid defaults of SearchProblem would run on the primitive grid with
+    corridor states, so split_state is the wrapped problem's, and the
+    bidirectional searches and jump point search are not supported.
+    """
+
+    def __init__(self, problem, graph):
+        self.problem = problem
+        self.graph = graph
+        self._expanded = 0
+
+    def __getattr__(self, attr):
+        return getattr(self.problem, attr)
+
+    def get_start_state(self):
+        return self.problem.get_start_state()
+
+    def is_goal_state(self, state):
+        return self.problem.is_goal_state(state)
+
+    def get_successors(self, state):
+        position, rest = self.problem.split_state(state)
+        successors = []
+        for end, actions in self.graph.edges_from(position):
+            successor, cost = state, 0
+            for steps, action in enumerate(actions, 1):
+                successor, step_cost = self.step(successor, action)
+                cost += step_cost
+                if self.problem.is_goal_state(successor) or self.problem.split_state(successor)[1] != rest:
+                    break
+            successors.append((successor, actions[:steps], cost))
+
+        self._expanded += 1
+        return successors
+
+    def split_state(self, state):
+        return self.problem.split_state(state)
+
+    def get_predecessors(self, state):
+        raise Exception('The bidirectional searches do not support junction graph problems')
+
+    def get_jump_successors(self, state, action):
+        raise Exception('Jump point search does not support junction graph problems')
+
+    def step(self, state, action):
+        """Returns the successor of state by action and its step cost."""
+        for successor, successor_action, step_cost in self.problem.get_successors(state):
+            if successor_action == action:
+                return successor, step_cost
+        raise Exception('Illegal action %s in corridor walk' % action)
+
+    def get_cost_of_actions(self, actions):
+        """Returns the cost of a sequence of primitive actions."""
+        return self.problem.get_cost_of_actions(actions)
+
+    def expand_path(self, path):
+        """Returns the primitive actions of a path of action tuples."""
+        return [action for actions in path for action in actions]
+
+def join_bidirectional_path(meeting_state, forward_parents, backward_parents):
+    """
+    Builds the list of actions from the start to the goal through
+    meeting_state. Parents map each reached state to (neighbor, action), or
+    None for the state the search started from: forward_parents from the
+    start and backward_parents from the goal.
+    """
+    path = []
+    state = meeting_state
+    while forward_parents[state] is not None:
+        state, action = forward_parents[state]
+        path.append(action)
+    path.reverse()
+    state = meeting_state
+    while backward_parents[state] is not None:
+        state, action = backward_parents[state]
+        path.append(action)
+    return path
+
+def bidirectional_search(problem):
+    """
+    Breadth first search from both the start state and problem.goal at the
+    same time, always growing the smaller of the two frontiers by a whole
+    layer, until they meet.  On open mazes, each side only needs to reach
+    half of the solution depth.
+    """
+    start, goal = problem.get_start_state(), problem.goal
+    if start == goal:
+        return []
+    # Each side maps the states it reached to (neighbor, action) and a depth
+    parents = ({start: None}, {goal: None})
+    depths = ({start: 0}, {goal: 0})
+    layers = ([start], [goal])
+    expand = (problem.get_successors, problem.get_predecessors)
+
+    while layers[0] and layers[1]:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        other = 1 - side
+        next_layer = []
+        best_meeting, best_length = None, None
+        for state in layers[side]:
+            for neighbor, action, _ in expand[side](state):
+                if neighbor in parents[side]: continue
+                parents[side][neighbor] = (state, action)
+                depths[side][neighbor] = depths[side][state] + 1
+                next_layer.append(neighbor)
+                if neighbor in parents[other]:
+                    length = depths[side][neighbor] + depths[other][neighbor]
+                    if best_length is None or length < best_length:
+                        best_meeting, best_length = neighbor, length
+        # The whole layer is expanded before stopping, so the shortest meeting is kept
+        if best_meeting is not None:
+            return join_bidirectional_path(best_meeting, parents[0], parents[1])
+        layers = (next_layer, layers[1]) if side == 0 else (layers[0], next_layer)
+
+    return []
+
+def bidirectional_a_star_search(problem, heuristic=null_heuristic):
+    """
+    A* search from both the start state and problem.goal, expanding each time
+    from the side with the lowest f value.  The backward search evaluates the
+    heuristic on a ReverseSearchProblem, so it estimates the distance to the
+    start.  Each time the searches meet, the best path found so far is kept,
+    and the search stops once no frontier node can lead to a cheaper one.
+    The heuristic must be consistent.
+    """
+    start, goal = problem.get_start_state(), problem.goal
+    problems = (problem, ReverseSearchProblem(problem))
+    parents = ({start: None}, {goal: None})
+    costs = ({start: 0}, {goal: 0})
+    expanded = (set(), set())
+    frontiers = (util.IndexedPriorityQueue(), util.IndexedPriorityQueue())
+    frontiers[0].push(start, heuristic(start, problems[0]))
+    frontiers[1].push(goal, heuristic(goal, problems[1]))
+    expand = (problem.get_successors, problem.get_predecessors)
+    best_meeting, best_cost = (start, 0) if start == goal else (None, None)
+
+    while not frontiers[0].is_empty() and not frontiers[1].is_empty():
+        lowest = (frontiers[0].heap[0][0], frontiers[1].heap[0][0])
+        if best_cost is not None and best_cost <= max(lowest):
+            break
+        side = 0 if lowest[0] <= lowest[1] else 1
+        other = 1 - side
+        state = frontiers[side].pop()
+        expanded[side].add(state)
+        for neighbor, action, step_cost in expand[side](state):
+            if neighbor in expanded[side]: continue
+            cost = costs[side][state] + step_cost
+            if neighbor in costs[side] and costs[side][neighbor] <= cost: continue
+            costs[side][neighbor] = cost
+            parents[side][neighbor] = (state, action)
+            frontiers[side].push(neighbor, cost + heuristic(neighbor, problems[side]))
+            if neighbor in costs[other]:
+                total_cost = cost + costs[other][neighbor]
+                if best_cost is None or total_cost < best_cost:
+                    best_meeting, best_cost = neighbor, total_cost
+
+    if best_meeting is None:
+        return []
+    return join_bidirectional_path(best_meeting, parents[0], parents[1])
+
+def iterative_deepening_a_star_search(problem, heuristic=null_heuristic):
+    """
+    IDA*: repeated depth first searches that prune every node whose f = g + h
+    exceeds a bound, starting with h(start) and raising the bound to the
+    lowest pruned f after each iteration.  Each iteration keeps the lowest
+    cost it has reached every state with, and drops nodes reaching a state
+    at no lower cost (cycles included), since the search below the other
+    node already covers them within the bound.  States are still expanded
+    again in every iteration.
+
+    The largest number of pending nodes is stored in problem._peak_frontier.
+    """
+    start_state = problem.get_start_state()
+    bound = heuristic(start_state, problem)
+    peak_frontier = 0
+
+    while True:
+        next_bound = float('inf')
+        frontier = [SearchNode(None, (start_state, None, 0))]
+        best_costs = {start_state: 0} # Lowest cost reaching each state in this iteration
+        while frontier:
+            peak_frontier = max(peak_frontier, len(frontier))
+            node = frontier.pop()
+            if node.cost > best_costs[node.state]:
+                continue # Reached again more cheaply while it was pending
+
+            f = node.cost + heuristic(node.state, problem)
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+            if problem.is_goal_state(node.state):
+                problem._peak_frontier = peak_frontier
+                return node.get_path()
+
+            for successor in reversed(problem.get_successors(node.state)):
+                successor_cost = node.cost + successor[2]
+                if best_costs.get(successor[0], float('inf')) <= successor_cost:
+                    continue
+                best_costs[successor[0]] = successor_cost
+                frontier.append(SearchNode(node, successor))
+
+        if next_bound == float('inf'):
+            problem._peak_frontier = peak_frontier
+            return []
+        bound = next_bound
+
+def anytime_repairing_a_star_search(problem, heuristic=null_heuristic, weight=3.0, weight_step=0.5,
+                                    time_limit=None, max_expanded=None):
+    """
+    ARA*: weighted A* (f = g + weight * h) that returns a first path quickly
+    and then keeps improving it, lowering the weight by weight_step after
+    each solution.  Each improvement reuses the previous search: only the
+    states whose cost dropped after they were expanded (the inconsistent
+    ones) are searched again.
+
+    Every path found is at most a bound times longer than an optimal one,
+    where the bound is min(weight, cost / lowest g + h of the states still
+    to search); it reaches 1 once the path is optimal.  Once a first path
+    is found, the search stops when time_limit seconds have passed or
+    max_expanded nodes have been expanded, if given, and returns the best
+    path so far.  The solutions, as (cost, bound, seconds) triples, are
+    stored in problem._anytime_solutions and the bound of the returned path
+    in problem._suboptimality_bound.
+    """
+    weight, weight_step = float(weight), float(weight_step)
+    time_limit = None if time_limit is None else float(time_limit)
+    max_expanded = None if max_expanded is None else int(max_expanded)
+    start_time = time.time()
+    start_state = problem.get_start_state()
+    g = {start_state: 0}
+    parents = {start_state: None} # State -> (parent state, action)
+    h = {}
+    open_states = util.IndexedPriorityQueue()
+    closed, inconsistent = set(), set()
+    goal = start_state if problem.is_goal_state(start_state) else None
+    expanded = 0
+    problem._anytime_solutions = []
+
+    def h_of(state):
+        if state not in h: h[state] = heuristic(state, problem)
+        return h[state]
+
+    def out_of_budget():
+        return ((time_limit is not None and time.time() - start_time >= time_limit) or
+                (max_expanded is not None and expanded >= max_expanded))
+
+    def improve_path():
+        """Runs weighted A* until the goal is no worse than the best f; False if stopped by the budget."""
+        nonlocal goal, expanded
+        while not open_states.is_empty() and (goal is None or g[goal] > open_states.heap[0][0]):
+            if goal is not None and out_of_budget(): return False
+            state = open_states.pop()
+            closed.add(state)
+            expanded += 1
+            for successor, action, cost in problem.get_successors(state):
+                if g[state] + cost < g.get(successor, float('inf')):
+                    g[successor] = g[state] + cost
+                    parents[successor] = (state, action)
+                    if problem.is_goal_state(successor) and (goal is None or g[successor] <= g[goal]):
+                        goal = successor
+                    if successor in closed:
+                        inconsistent.add(successor)
+                    else:
+                        open_states.push(successor, g[successor] + weight * h_of(successor))
+        return True
+
+    open_states.push(start_state, weight * h_of(start_state))
+    bound = float('inf')
+    while True:
+        finished = improve_path()
+        if goal is None: return [] # Every reachable state was searched
+        lowest = min([g[state] + h[state] for state in open_states.positions] +
+                     [g[state] + h[state] for state in inconsistent] + [g[goal]])
+        if lowest > 0: bound = min(bound, g[goal] / lowest)
+        if finished: bound = min(bound, weight) # A stopped search does not prove the weight's bound
+        solution = (g[goal], bound, time.time() - start_time)
+        if not problem._anytime_solutions or problem._anytime_solutions[-1][:2] != solution[:2]:
+            problem._anytime_solutions.append(solution)
+        if not finished or bound <= 1 or out_of_budget(): break
+
+        # Search again with a lower weight, from the open and inconsistent states
+        weight = max(1.0, weight - weight_step)
+        states = list(open_states.positions) + list(inconsistent)
+        open_states = util.IndexedPriorityQueue()
+        for state in states:
+            open_states.push(state, g[state] + weight * h_of(state))
+        closed.clear()
+        inconsistent.clear()
+
+    problem._suboptimality_bound = bound
+    path = []
+    state = goal
+    while parents[state] is not None:
+        state, action = parents[state]
+        path.append(action)
+    path.reverse()
+    return path
+
+class MemoryBoundedNode:
+    """A node of simplified_memory_bounded_a_star_search."""
+    __slots__ = ('state', 'action', 'parent', 'cost', 'depth', 'f', 'children', 'forgotten_f')
+
+    def __init__(self, state, action, parent, cost, f):
+        self.state = state
+        self.action = action
+        self.parent = parent
+        self.cost = cost
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.f = f
+        self.children = [] # Successors currently in memory
+        self.forgotten_f = float('inf') # Lowest f of the successors dropped from memory
+
+    def open_f(self):
+        """The f value this node is queued with, while it is a leaf or has forgotten successors."""
+        return self.forgotten_f if self.children else self.f
+
+    def get_path(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
+def simplified_memory_bounded_a_star_search(problem, heuristic=null_heuristic, max_nodes=100000):
+    """
+    SMA*: A* that keeps at most max_nodes search nodes in memory.  When the
+    budget is exceeded, the leaf with the highest f (the shallowest one among
+    ties) is dropped and its f is remembered by its parent, which is queued
+    again to regenerate it if the rest of its subtree turns out to be worse.
+    f values are backed up from children to parents, so forgotten subtrees
+    keep their best estimate.  It is optimal if the budget can hold the
+    optimal path, and returns [] if no solution fits in the budget.
+    Successors already on the path to their parent, or in memory with a
+    lower or equal cost, are not generated, since the other node covers
+    them.
+
+    The largest number of queued nodes is stored in problem._peak_frontier,
+    and the largest number of nodes in memory in problem._peak_nodes.
+    """
+    max_nodes = int(max_nodes)
+    start_state = problem.get_start_state()
+    root = MemoryBoundedNode(start_state, None, None, 0, heuristic(start_state, problem))
+    best_first = util.IndexedPriorityQueue() # Nodes to expand: lowest f first, deepest among ties
+    worst_first = util.IndexedPriorityQueue() # Leaves to drop: highest f first, shallowest among ties
+    used_nodes = peak_nodes = peak_frontier = 1
+    in_memory = {start_state: [root]} # The nodes in memory of each state
+
+    def requeue(node):
+        # Leaves can be expanded or dropped, interior nodes only expanded again
+        # if some of their successors were forgotten
+        if not node.children or node.forgotten_f != float('inf'):
+            best_first.push(node, (node.open_f(), -node.depth))
+        elif best_first.contains(node):
+            best_first.remove(node)
+        if not node.children:
+            worst_first.push(node, (-node.f, node.depth))
+        elif worst_first.contains(node):
+            worst_first.remove(node)
+
+    def back_up(node):
+        while node is not None and node.children:
+            backed_up_f = min(min(child.f for child in node.children), node.forgotten_f)
+            if backed_up_f == node.f: break
+            node.f = backed_up_f
+            node = node.parent
+
+    requeue(root)
+    while not best_first.is_empty():
+        best = best_first.pop()
+        if worst_first.contains(best):
+            worst_first.remove(best)
+        if best.open_f() == float('inf'):
+            break
+        if not best.children and problem.is_goal_state(best.state):
+            problem._peak_frontier, problem._peak_nodes = peak_frontier, peak_nodes
+            return best.get_path()
+
+        # (Re)generate the successors that are not in memory, skipping cycles
+        # and states reached at a lower or equal cost elsewhere
+        on_path = set(child.state for child in best.children)
+        ancestor = best
+        while ancestor is not None:
+            on_path.add(ancestor.state)
+            ancestor = ancestor.parent
+        for successor_state, action, step_cost in problem.get_successors(best.state):
+            if successor_state in on_path: continue
+            cost = best.cost + step_cost
+            if any(node.cost <= cost for node in in_memory.get(successor_state, ())): continue
+            if best.depth + 2 >= max_nodes and not problem.is_goal_state(successor_state):
+                f = float('inf') # The path to it already fills the memory budget
+            else:
+                f = max(best.f, cost + heuristic(successor_state, problem))
+            child = MemoryBoundedNode(successor_state, action, best, cost, f)
+            best.children.append(child)
+            in_memory.setdefault(successor_state, []).append(child)
+            requeue(child)
+            used_nodes += 1
+        best.forgotten_f = float('inf')
+        if not best.children:
+            best.f = float('inf') # Dead end
+        requeue(best)
+        back_up(best)
+
+        # Drop the worst leaves until the memory budget is met
+        while used_nodes > max_nodes and not worst_first.is_empty():
+            worst = worst_first.pop()
+            if worst is root:
+                break
+            best_first.remove(worst)
+            parent = worst.parent
+            parent.children.remove(worst)
+            in_memory[worst.state].remove(worst)
+            if not in_memory[worst.state]:
+                del in_memory[worst.state]
+            parent.forgotten_f = min(parent.forgotten_f, worst.f)
+            if not parent.children:
+                parent.f = parent.forgotten_f
+            used_nodes -= 1
+            requeue(parent)
+            back_up(parent)
+
+        peak_nodes = max(peak_nodes, used_nodes)
+        peak_frontier = max(peak_frontier, len(best_first.heap))
+
+    problem._peak_frontier, problem._peak_nodes = peak_frontier, peak_nodes
+    return []
+
+# A picklable description of a PositionSearchProblem for solve_many: the
+# layout text (a list of lines, as in layout.Layout) and the start and goal
+SearchProblemDescriptor = collections.namedtuple('SearchProblemDescriptor', ['layout_text', 'start', 'goal'])
+
+SOLVE_MANY_WALLS_CACHE = {} # Layout text -> walls, in each worker process
+
+def solve_descriptors(chunk, fn, heuristic):
+    """
+    Solves a list of (index, SearchProblemDescriptor) pairs and returns the
+    list of (index, path) pairs.  This runs in the worker processes of
+    solve_many, which parse each layout once.
+    """
+    from layout import Layout
+    from search_agents import CustomGameState, PositionSearchProblem
+    results = []
+    for index, descriptor in chunk:
+        key = tuple(descriptor.layout_text)
+        if key not in SOLVE_MANY_WALLS_CACHE:
+            SOLVE_MANY_WALLS_CACHE[key] = Layout(list(key)).walls
+        game_state = CustomGameState(tuple(descriptor.start), SOLVE_MANY_WALLS_CACHE[key])
+        problem = PositionSearchProblem(game_state, goal=tuple(descriptor.goal), warn=False, visualize=False)
+        if heuristic is None:
+            results.append((index, fn(problem)))
+        else:
+            results.append((index, fn(problem, heuristic=heuristic)))
+    return results
+
+def solve_many(problems, fn=breadth_first_search, heuristic=None, workers=None, chunksize=None):
+    """
+    Solves many PositionSearchProblems, given as SearchProblemDescriptors, in
+    a pool of worker processes and yields (index, path) pairs, where index is
+    the position of the problem in problems, as soon as they are solved.
+
+    fn and heuristic must be picklable, i.e. module level functions (or their
+    names in search.py).  Problems are sent in chunks of chunksize (by
+    default about four chunks per worker); workers defaults to the number of
+    CPUs, and workers=1 solves the problems in this process.  For example,
+    the maze distances between all pairs of points:
+
+      descriptors = [SearchProblemDescriptor(layout.layout_text, p1, p2) for p1, p2 in pairs]
+      for index, path in solve_many(descriptors, bfs, workers=16): ...
+    """
+    if isinstance(fn, str): fn = globals()[fn]
+    if isinstance(heuristic, str): heuristic = globals()[heuristic]
+    workers = workers or os.cpu_count() or 1
+    problems = list(enumerate(problems))
+    if chunksize is None:
+        chunksize = max(1, len(problems) // (workers * 4))
+    chunks = [problems[i:i + chunksize] for i in range(0, len(problems), chunksize)]
+
+    if workers == 1:
+        for chunk in chunks:
+            for result in solve_descriptors(chunk, fn, heuristic):
+                yield result
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_descriptors, chunk, fn, heuristic) for chunk in chunks]
+        for future in concurrent.futures.as_completed(futures):
+            for result in future.result():
+                yield result
+
 # Abbreviations
 bfs = breadth_first_search
 dfs = depth_first_search
 astar = a_star_search
 ucs = uniform_cost_search
+bibfs = bidirectional_search
+biastar = bidirectional_a_star_search
+idastar = iterative_deepening_a_star_search
+smastar = simplified_memory_bounded_a_star_search
+jps = jump_point_search
+arastar = anytime_repairing_a_star_search
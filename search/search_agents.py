@@ -38,6 +38,9 @@ from game import Directions
 from game import Agent
 from game import Actions
 from game import Grid
+from game import BitGrid
+from layout import JunctionGraph
+from layout import MazeDistanceOracle
 import util
 import time
 import search
@@ -70,21 +73,31 @@ class SearchAgent(Agent):
       depth_first_search or dfs
       breadth_first_search or bfs
 
+    Any other agent argument is passed on to the search function, for
+    example: -a fn=smastar,heuristic=manhattan_heuristic,max_nodes=500
+
+    With heuristic_cache=N, the heuristic values of the last N states are
+    kept in an LRU cache (search.HeuristicCache), whose statistics are
+    printed after the search.
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depth_first_search', prob='PositionSearchProblem', heuristic='null_heuristic'):
+    def __init__(self, fn='depth_first_search', prob='PositionSearchProblem', heuristic='null_heuristic', heuristic_cache=0, **search_args):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
         super().__init__()
+        self.heuristic_cache = None
         if fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
         func = getattr(search, fn)
+        for arg in search_args:
+            if arg not in func.__code__.co_varnames[:func.__code__.co_argcount]:
+                raise AttributeError(arg + ' is not an argument of ' + fn + ' in search.py.')
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            self.searchFunction = lambda x: func(x, **search_args)
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -92,9 +105,11 @@ class SearchAgent(Agent):
                 heur = getattr(search, heuristic)
             else:
                 raise AttributeError(heuristic + ' is not a function in search_agents.py or search.py.')
+            if int(heuristic_cache) > 0:
+                heur = self.heuristic_cache = search.HeuristicCache(heur, int(heuristic_cache))
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **search_args)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -118,6 +133,16 @@ class SearchAgent(Agent):
         total_cost = problem.get_cost_of_actions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (total_cost, time.time() - start_time))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if '_peak_frontier' in dir(problem): print('Peak frontier size: %d' % problem._peak_frontier)
+        if '_peak_nodes' in dir(problem): print('Peak nodes in memory: %d' % problem._peak_nodes)
+        if '_suboptimality_bound' in dir(problem):
+            print('Solutions (cost, bound, seconds): %s' % ', '.join('(%d, %.2f, %.2f)' % solution
+                                                                   for solution in problem._anytime_solutions))
+            print('Suboptimality bound: %.2f' % problem._suboptimality_bound)
+        if self.heuristic_cache is not None:
+            cache = self.heuristic_cache.cache
+            print('Heuristic cache: %d hits, %d misses, %d entries using about %d bytes' %
+                  (cache.hits, cache.misses, len(cache), cache.memory_usage()))
 
     def get_action(self, state):
         """
@@ -204,12 +229,39 @@ class PositionSearchProblem(search.SearchProblem):
                 cost = self.cost_fn(next_state)
                 successors.append( ( next_state, action, cost) )
 
+        self._record_expansion(state)
+
+        return successors
+
+    def _record_expansion(self, state):
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
         if state not in self._visited:
             self._visited[state] = True
             self._visited_list.append(state)
 
+    def get_predecessors(self, state):
+        """
+        Returns the states from which a single move reaches state, for the
+        bidirectional searches (see search.SearchProblem.get_predecessors).
+        Expansions in this direction are counted as well.
+        """
+        predecessors = super().get_predecessors(state)
+
+        self._record_expansion(state)
+
+        return predecessors
+
+    def get_jump_successors(self, state, action):
+        """
+        Returns the jump points reached from state, for jump_point_search (see
+        search.SearchProblem.get_jump_successors).  Only the cost_fn of 1 is
+        supported; expansions are counted as well.
+        """
+        successors = super().get_jump_successors(state, action)
+
+        self._record_expansion(state)
+
         return successors
 
     def get_cost_of_actions(self, actions):
@@ -410,6 +462,10 @@ class FoodSearchProblem:
     def is_goal_state(self, state):
         return state[1].count() == 0
 
+    def split_state(self, state):
+        """Returns Pacman's position and the food grid of a state."""
+        return state
+
     def get_successors(self, state):
         """Returns successor states, the actions they require, and a cost of 1."""
         successors = []
@@ -427,7 +483,7 @@ class FoodSearchProblem:
     def get_cost_of_actions(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
         include an illegal move, return 999999"""
-        x,y= self.get_start_state()[0]
+        x,y= self.start[0]
         cost = 0
         for action in actions:
             # figure out the next state and see whether it's legal
@@ -438,13 +494,100 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+class EncodedFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem whose search states are single ints, so that hashing
+    and comparing them are native int operations and no food grid is copied
+    per successor.
+
+    Open cells are numbered by the MazeDistanceOracle of the walls, and the
+    starting food pellets by their order in food.as_list().  A state packs
+    the bitmask of the remaining pellets above Pacman's cell number:
+      state = food_mask << position_bits | cell
+    decode_state turns a state back into ( pacman_position, foodGrid ).
+    """
+    def __init__(self, starting_game_state):
+        super().__init__(starting_game_state)
+        self.maze_distances = MazeDistanceOracle.for_walls(self.walls)
+        cells = self.maze_distances.cells
+        self.pellets = self.start[1].as_list()
+        self.pellet_cells = [self.maze_distances.cell_id(pellet) for pellet in self.pellets]
+        self.position_bits = len(cells).bit_length()
+        self.position_mask = (1 << self.position_bits) - 1
+
+        # For every cell, the legal moves as (direction, next cell, food mask
+        # keeping all pellets but the one eaten in the next cell)
+        keep = [-1] * len(cells)
+        for index, cell in enumerate(self.pellet_cells):
+            keep[cell] = ~(1 << index)
+        self.moves = []
+        for x, y in cells:
+            moves = []
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.direction_to_vector(direction)
+                next_x, next_y = int(x + dx), int(y + dy)
+                if not self.walls[next_x][next_y]:
+                    next_cell = self.maze_distances.cell_id((next_x, next_y))
+                    moves.append((direction, next_cell, keep[next_cell]))
+            self.moves.append(moves)
+        self.start_state = self.encode_state(*self.start)
+
+    def encode_state(self, position, food_grid):
+        food_mask = 0
+        for index, pellet in enumerate(self.pellets):
+            if food_grid[pellet[0]][pellet[1]]:
+                food_mask |= 1 << index
+        return food_mask << self.position_bits | self.maze_distances.cell_id(position)
+
+    def decode_state(self, state):
+        food_grid = BitGrid(self.walls.width, self.walls.height)
+        food_mask = state >> self.position_bits
+        for index, (x, y) in enumerate(self.pellets):
+            if food_mask >> index & 1:
+                food_grid[x][y] = True
+        return self.maze_distances.cells[state & self.position_mask], food_grid
+
+    def get_start_state(self):
+        return self.start_state
+
+    def is_goal_state(self, state):
+        return state >> self.position_bits == 0
+
+    def split_state(self, state):
+        """Returns Pacman's position and the food bitmask of a state."""
+        return self.maze_distances.cells[state & self.position_mask], state >> self.position_bits
+
+    def get_successors(self, state):
+        """Returns successor states, the actions they require, and a cost of 1."""
+        self._expanded += 1
+        food_mask = state >> self.position_bits
+        return [((food_mask & keep) << self.position_bits | next_cell, direction, 1)
+                for direction, next_cell, keep in self.moves[state & self.position_mask]]
+
 class AStarFoodSearchAgent(SearchAgent):
-    """A SearchAgent for FoodSearchProblem using A* and your food_heuristic"""
-    def __init__(self):
+    """
+    A SearchAgent for FoodSearchProblem using A* and your food_heuristic, or
+    another heuristic given with -a heuristic=mst_food_heuristic
+    """
+    def __init__(self, heuristic='food_heuristic'):
         super().__init__()
-        self.searchFunction = lambda prob: search.a_star_search(prob, food_heuristic)
+        heuristic = globals()[heuristic]
+        self.searchFunction = lambda prob: search.a_star_search(prob, heuristic)
         self.searchType = FoodSearchProblem
 
+class JunctionSearchAgent(SearchAgent):
+    """
+    A SearchAgent that searches its problem along the corridors of the
+    layout's JunctionGraph instead of cell by cell (see
+    search.JunctionSearchProblem).  It takes the same arguments, for example:
+    -p JunctionSearchAgent -a fn=astar,prob=FoodSearchProblem,heuristic=food_heuristic
+    """
+    def __init__(self, fn='depth_first_search', prob='PositionSearchProblem', heuristic='null_heuristic', **search_args):
+        super().__init__(fn, prob, heuristic, **search_args)
+        search_function, search_type = self.searchFunction, self.searchType
+        self.searchFunction = lambda prob: prob.expand_path(search_function(prob))
+        self.searchType = lambda state: search.JunctionSearchProblem(search_type(state), JunctionGraph.for_walls(state.get_walls()))
+
 # Defined by us
 class CustomGameState:
     def __init__(self, position, walls, food=None):
@@ -530,21 +673,156 @@ def food_heuristic(state, problem):
     problem.heuristic_info['wallCount']
     """
     
-    position, food_grid = state
     "*** YOUR CODE HERE ***"
+    if 'maze_distances' not in problem.heuristic_info: # The all-pairs maze distances are computed once per layout
+        problem.heuristic_info['maze_distances'] = MazeDistanceOracle.for_walls(problem.walls)
+    maze_distances = problem.heuristic_info['maze_distances']
+
+    if isinstance(state, int): # An EncodedFoodSearchProblem state: the pellets are read from its food bitmask
+        food_mask = state >> problem.position_bits
+        row = (state & problem.position_mask) * len(maze_distances.cells)
+        max_distance = 0
+        while food_mask:
+            pellet = food_mask & -food_mask
+            max_distance = max(max_distance, maze_distances.distances[row + problem.pellet_cells[pellet.bit_length() - 1]])
+            food_mask ^= pellet
+        return max_distance
+
+    position, food_grid = state
     food_list = food_grid.as_list()
-    problem_state = problem.starting_game_state # We save this state in order to use maze_distance function
     
     if not food_list: # If there is no food in the maze then the heuristic will return 0, as we are in the solution
         return 0
     
     max_distance = 0
     for food in food_list: 
-        max_distance = max(max_distance, maze_distance(position, food, problem_state)) # We compute the heuristic as the max 
+        max_distance = max(max_distance, maze_distances.distance(position, food)) # We compute the heuristic as the max 
         # maze distance, as it is consistent and it happens to be the one which estimates a greater heuristic so it will 
         # perform better
     return max_distance
 
+class FoodSpanningTrees:
+    """
+    Minimum spanning trees of sets of food pellets under maze distances,
+    memoized by food mask: bit i of a mask stands for the i-th pellet of the
+    starting food.as_list().
+
+    A tree is built with Prim's algorithm, unless the tree of the set with
+    one more pellet is known.  Removing that pellet from it leaves subtrees
+    that are still minimal, so they only need to be reconnected by their
+    cheapest edges, and nothing is left to do when the pellet was a leaf.
+    """
+    def __init__(self, walls, pellets):
+        self.maze_distances = MazeDistanceOracle.for_walls(walls)
+        self.pellets = pellets
+        self.pellet_indices = {pellet: index for index, pellet in enumerate(pellets)}
+        self.pellet_distances = [[self.maze_distances.distance(p1, p2) for p2 in pellets] for p1 in pellets]
+        self.trees = {} # Food mask -> (weight, [(pellet index, pellet index)])
+
+    def food_mask(self, food):
+        """Returns the mask of an int food mask or of a food Grid."""
+        if isinstance(food, int): return food
+        return sum(1 << index for index, (x, y) in enumerate(self.pellets) if food[x][y])
+
+    def tree(self, food_mask, removed=None):
+        """
+        Returns (weight, edges) of the tree of food_mask.  If food_mask lost
+        the pellet of index removed, the tree of the previous mask is reused.
+        """
+        if food_mask not in self.trees:
+            previous_mask = None if removed is None else food_mask | 1 << removed
+            if previous_mask in self.trees:
+                self.trees[food_mask] = self.remove_pellet(self.trees[previous_mask], removed)
+            else:
+                self.trees[food_mask] = self.build_tree(food_mask)
+        return self.trees[food_mask]
+
+    def build_tree(self, food_mask):
+        nodes = [index for index in range(len(self.pellets)) if food_mask >> index & 1]
+        if not nodes: return 0, []
+        distances = self.pellet_distances
+        weight, edges = 0, []
+        best = {node: (distances[nodes[0]][node], nodes[0]) for node in nodes[1:]}
+        while best:
+            node = min(best, key=lambda n: best[n][0])
+            distance, parent = best.pop(node)
+            weight += distance
+            edges.append((parent, node))
+            for other in best:
+                if distances[node][other] < best[other][0]:
+                    best[other] = (distances[node][other], node)
+        return weight, edges
+
+    def remove_pellet(self, tree, removed):
+        weight, edges = tree
+        distances = self.pellet_distances
+        kept = [edge for edge in edges if removed not in edge]
+        neighbors = [a if b == removed else b for a, b in edges if removed in (a, b)]
+        weight -= sum(distances[removed][neighbor] for neighbor in neighbors)
+        if len(neighbors) <= 1: return weight, kept
+
+        # Label the subtrees left by the removal and join them, Kruskal style,
+        # with the cheapest edges between them
+        component = {}
+        adjacency = {}
+        for a, b in kept:
+            adjacency.setdefault(a, []).append(b)
+            adjacency.setdefault(b, []).append(a)
+        for label, neighbor in enumerate(neighbors):
+            component[neighbor] = label
+            stack = [neighbor]
+            while stack:
+                node = stack.pop()
+                for other in adjacency.get(node, []):
+                    if other not in component:
+                        component[other] = label
+                        stack.append(other)
+        cheapest = {}
+        for a in component:
+            for b in component:
+                if component[a] < component[b]:
+                    labels = (component[a], component[b])
+                    if labels not in cheapest or distances[a][b] < cheapest[labels][0]:
+                        cheapest[labels] = (distances[a][b], a, b)
+        labels = list(range(len(neighbors)))
+        def find(label):
+            while labels[label] != label: label = labels[label]
+            return label
+        for distance, a, b in sorted(cheapest.values()):
+            root_a, root_b = find(component[a]), find(component[b])
+            if root_a != root_b:
+                labels[root_a] = root_b
+                weight += distance
+                kept.append((a, b))
+        return weight, kept
+
+def mst_food_heuristic(state, problem):
+    """
+    A consistent heuristic for the FoodSearchProblem (and the
+    EncodedFoodSearchProblem): the maze distance to the nearest pellet plus
+    the weight of a minimum spanning tree of the remaining pellets.
+
+    The spanning tree of {pacman} and the food would not be consistent: one
+    step towards two pellets can shorten two of its edges at once.  Going
+    through the nearest pellet first gives a spanning tree of that set, so
+    this bound is never weaker.  The trees are kept in
+    problem.heuristic_info['food_spanning_trees'].
+    """
+    position, food = problem.split_state(state)
+    if 'food_spanning_trees' not in problem.heuristic_info:
+        problem.heuristic_info['food_spanning_trees'] = FoodSpanningTrees(problem.walls, problem.start[1].as_list())
+    trees = problem.heuristic_info['food_spanning_trees']
+
+    food_mask = trees.food_mask(food)
+    if not food_mask:
+        return 0
+    nearest = min(trees.maze_distances.distance(position, trees.pellets[index])
+                  for index in range(len(trees.pellets)) if food_mask >> index & 1)
+    removed = trees.pellet_indices.get(position) # The pellet eaten, if any, by the last move
+    if removed is not None and food_mask >> removed & 1:
+        removed = None
+    return nearest + trees.tree(food_mask, removed)[0]
+
 def simplified_corners_heuristic(state, problem):
     """
     A heuristic for the CornersProblem that you defined.
@@ -636,11 +914,16 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         "*** YOUR CODE HERE ***"
         util.raise_not_defined()
 
-def maze_distance(point1, point2, game_state):
+def maze_distance(point1, point2, game_state, fn=None):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The game_state can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points. The game_state can be any
+    game state -- Pacman's position in that state is ignored.
+
+    Distances are looked up in the MazeDistanceOracle (layout.py) of the walls,
+    which is built with one breadth first search per open cell the first time
+    a layout is seen; later calls are O(1).  To compute a single distance
+    without building the oracle, pass a search function as fn, for example
+    search.bidirectional_search.
 
     Example usage: maze_distance( (2,4), (5,6), game_state)
 
@@ -651,6 +934,9 @@ def maze_distance(point1, point2, game_state):
     walls = game_state.get_walls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(game_state, start=point1, goal=point2, warn=False, visualize=False)
-    # return len(search.bfs(prob))
-    return len(search.astar(problem=prob, heuristic=manhattan_heuristic))
+    if fn is not None:
+        prob = PositionSearchProblem(game_state, start=point1, goal=point2, warn=False, visualize=False)
+        return len(fn(prob))
+    distance = MazeDistanceOracle.for_walls(walls).distance(point1, point2)
+    # Like an empty search result, unreachable points are at distance 0
+    return 0 if distance == MazeDistanceOracle.UNREACHABLE else distance
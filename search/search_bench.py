@@ -0,0 +1,248 @@
+# search_bench.py
+# ---------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Benchmarks the search functions of search.py on the problems of
+search_agents.py, headlessly, for every layout in layouts/.
+
+Every run (layout, problem, algorithm, heuristic) happens in its own process,
+so that it can be stopped after a timeout and its peak memory is its own.  A
+run records its wall time, the nodes expanded, the peak frontier size, the
+peak resident set size of the process and the cost of the path found.
+
+Results can be written as JSON and CSV, and compared to the JSON of an
+earlier run to catch performance regressions:
+
+    python search_bench.py -l tinyMaze,mediumMaze --json baseline.json
+    python search_bench.py -l tinyMaze,mediumMaze --baseline baseline.json
+"""
+
+import csv
+import glob
+import json
+import multiprocessing
+import optparse
+import os
+import sys
+import time
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+import layout
+import pacman
+import search
+import search_agents
+import util
+
+ALGORITHMS = ['dfs', 'bfs', 'ucs', 'astar']
+
+# The heuristics tried with the algorithms that take one, by problem type
+PROBLEM_HEURISTICS = {
+    'PositionSearchProblem': ['null_heuristic', 'manhattan_heuristic', 'euclidean_heuristic'],
+    'CornersProblem': ['null_heuristic', 'corners_heuristic'],
+    'FoodSearchProblem': ['null_heuristic', 'food_heuristic', 'mst_food_heuristic'],
+}
+
+FIELDS = ['layout', 'problem', 'algorithm', 'heuristic', 'status', 'time', 'expanded',
+          'peak_frontier', 'peak_rss_kb', 'cost', 'error']
+
+def track_frontier_sizes(peak):
+    """
+    Replaces the frontier containers of util with subclasses that record in
+    peak[0] the largest size they had when popped.  Only meant for the
+    process of a single run.
+    """
+    def tracking(container_class, items):
+        class TrackingContainer(container_class):
+            def pop(self):
+                peak[0] = max(peak[0], len(getattr(self, items)))
+                return super().pop()
+        return TrackingContainer
+
+    util.Stack = tracking(util.Stack, 'list')
+    util.Queue = tracking(util.Queue, 'list')
+    util.PriorityQueue = tracking(util.PriorityQueue, 'heap')
+    util.IndexedPriorityQueue = tracking(util.IndexedPriorityQueue, 'heap')
+
+def make_problem(layout_name, problem_name):
+    """Returns the search problem of a layout, or None if it has no goal."""
+    game_state = pacman.GameState()
+    game_state.initialize(layout.get_layout(layout_name), 0)
+    if problem_name == 'PositionSearchProblem':
+        if game_state.has_wall(1, 1): return None
+        return search_agents.PositionSearchProblem(game_state, warn=False, visualize=False)
+    return getattr(search_agents, problem_name)(game_state)
+
+def run(layout_name, problem_name, algorithm, heuristic_name, connection):
+    """Runs one benchmark and sends its record through connection."""
+    record = {'status': 'ok'}
+    peak = [0]
+    track_frontier_sizes(peak)
+    util.mute_print()
+    try:
+        problem = make_problem(layout_name, problem_name)
+        if problem is None:
+            record['status'] = 'skipped'
+        else:
+            function = getattr(search, algorithm)
+            start_time = time.perf_counter()
+            if heuristic_name is None:
+                path = function(problem)
+            else:
+                heuristic = getattr(search_agents, heuristic_name, None) or getattr(search, heuristic_name)
+                path = function(problem, heuristic=heuristic)
+            record['time'] = time.perf_counter() - start_time
+            record['cost'] = problem.get_cost_of_actions(path)
+            record['expanded'] = getattr(problem, '_expanded', None)
+            record['peak_frontier'] = getattr(problem, '_peak_frontier', peak[0])
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = '%s: %s' % (type(e).__name__, e)
+    finally:
+        util.unmute_print()
+    if resource is not None:
+        record['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send(record)
+    connection.close()
+
+def benchmark(layout_name, problem_name, algorithm, heuristic_name=None, timeout=60):
+    """Returns the record of one run, made in a new process."""
+    record = dict.fromkeys(FIELDS)
+    record.update(layout=layout_name, problem=problem_name, algorithm=algorithm, heuristic=heuristic_name)
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=run, args=(layout_name, problem_name, algorithm, heuristic_name, sender))
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        record.update(receiver.recv())
+    else:
+        record['status'] = 'timeout'
+    process.terminate()
+    process.join()
+    return record
+
+def benchmark_matrix(layout_names, problem_names, algorithms, timeout=60):
+    """
+    Yields the record of every run of the matrix, as soon as it is done.
+    Algorithms that take a heuristic are run once per heuristic of the
+    problem in PROBLEM_HEURISTICS.
+    """
+    for layout_name in layout_names:
+        for problem_name in problem_names:
+            for algorithm in algorithms:
+                if 'heuristic' in getattr(search, algorithm).__code__.co_varnames:
+                    heuristics = PROBLEM_HEURISTICS.get(problem_name, ['null_heuristic'])
+                else:
+                    heuristics = [None]
+                for heuristic_name in heuristics:
+                    yield benchmark(layout_name, problem_name, algorithm, heuristic_name, timeout)
+
+def record_key(record):
+    return (record['layout'], record['problem'], record['algorithm'], record['heuristic'])
+
+def compare(records, baseline, tolerance=0.25, min_time=0.01):
+    """
+    Returns messages for the runs that did worse than in the baseline
+    records: runs that no longer succeed, find costlier paths or expand more
+    nodes, and runs slower by more than tolerance (and min_time seconds).
+    """
+    baseline = {record_key(record): record for record in baseline}
+    regressions = []
+    for record in records:
+        old = baseline.get(record_key(record))
+        if old is None or old['status'] != 'ok': continue
+        name = '%s %s %s %s' % record_key(record)
+        if record['status'] != 'ok':
+            regressions.append('%s: %s (was ok)' % (name, record['status']))
+            continue
+        if record['cost'] > old['cost']:
+            regressions.append('%s: cost %s (was %s)' % (name, record['cost'], old['cost']))
+        if old['expanded'] is not None and record['expanded'] > old['expanded']:
+            regressions.append('%s: %s nodes expanded (was %s)' % (name, record['expanded'], old['expanded']))
+        if record['time'] > old['time'] * (1 + tolerance) and record['time'] - old['time'] > min_time:
+            regressions.append('%s: %.3fs (was %.3fs)' % (name, record['time'], old['time']))
+    return regressions
+
+def write_csv(records, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+def write_json(records, path):
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=1)
+
+def format_record(record):
+    def show(value, pattern='%s'):
+        return '-' if value is None else pattern % value
+    return '%-18s %-22s %-7s %-20s %-8s %9s %9s %9s %9s %7s' % (
+        record['layout'], record['problem'], record['algorithm'], show(record['heuristic']),
+        record['status'], show(record['time'], '%.3f'), show(record['expanded']),
+        show(record['peak_frontier']), show(record['peak_rss_kb']), show(record['cost']))
+
+def read_command(argv):
+    """Processes the command used to run the benchmarks from the command line."""
+    parser = optparse.OptionParser(description='Benchmark the search functions on the search layouts')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layout names (default: every layouts/*.lay)')
+    parser.add_option('-p', '--problems', dest='problems', default=','.join(PROBLEM_HEURISTICS),
+                      help='comma separated problem types of search_agents.py (default: %default)')
+    parser.add_option('-f', '--functions', dest='functions', default=','.join(ALGORITHMS),
+                      help='comma separated search functions of search.py (default: %default)')
+    parser.add_option('-t', '--timeout', dest='timeout', type='float', default=60,
+                      help='seconds after which a run is stopped (default: %default)')
+    parser.add_option('--json', dest='json', default=None, help='write the records to this JSON file')
+    parser.add_option('--csv', dest='csv', default=None, help='write the records to this CSV file')
+    parser.add_option('--baseline', dest='baseline', default=None,
+                      help='JSON records of an earlier run to compare against')
+    parser.add_option('--tolerance', dest='tolerance', type='float', default=0.25,
+                      help='relative slowdown reported as a regression (default: %default)')
+    options, other_junk = parser.parse_args(argv)
+    if len(other_junk) != 0:
+        raise Exception('Command line input not understood: ' + str(other_junk))
+
+    if options.layouts is None:
+        layout_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layouts')
+        options.layouts = sorted(os.path.basename(path)[:-len('.lay')]
+                                 for path in glob.glob(os.path.join(layout_dir, '*.lay')))
+    else:
+        options.layouts = options.layouts.split(',')
+    options.problems = options.problems.split(',')
+    options.functions = options.functions.split(',')
+    for function in options.functions:
+        if function not in dir(search):
+            raise AttributeError(function + ' is not a search function in search.py.')
+    return options
+
+if __name__ == '__main__':
+    options = read_command(sys.argv[1:])
+    records = []
+    print('%-18s %-22s %-7s %-20s %-8s %9s %9s %9s %9s %7s' % ('layout', 'problem', 'fn', 'heuristic', 'status',
+          'time', 'expanded', 'frontier', 'rss_kb', 'cost'))
+    for record in benchmark_matrix(options.layouts, options.problems, options.functions, options.timeout):
+        print(format_record(record))
+        records.append(record)
+
+    if options.json is not None: write_json(records, options.json)
+    if options.csv is not None: write_csv(records, options.csv)
+    if options.baseline is not None:
+        with open(options.baseline) as f:
+            regressions = compare(records, json.load(f), options.tolerance)
+        print('%d regression(s) against %s' % (len(regressions), options.baseline))
+        for regression in regressions:
+            print('  ' + regression)
+        sys.exit(1 if regressions else 0)
@@ -368,6 +368,125 @@ class PacmanSearchTest(test_classes.TestCase):
         return True
 
 
+class SearchBudgetExceeded(Exception):
+    pass
+
+class MemoryBoundedSearchTest(test_classes.TestCase):
+    """
+    Runs a memory bounded search on a layout with cycles and checks that it
+    finds an optimal path without expanding more than max_expanded nodes.
+    """
+
+    def __init__(self, question, test_dict):
+        super(MemoryBoundedSearchTest, self).__init__(question, test_dict)
+        self.layout_text = test_dict['layout']
+        self.alg = test_dict['algorithm']
+        self.layoutName = test_dict['layoutName']
+        self.heuristicName = test_dict['heuristic']
+        self.max_expanded = int(test_dict['max_expanded'])
+        self.searchProblemClassName = test_dict.get('searchProblemClass', 'PositionSearchProblem')
+
+    def setup_problem(self, search_agents_module):
+        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
+        start_state = pacman.GameState()
+        start_state.initialize(lay, 0)
+        problem = getattr(search_agents_module, self.searchProblemClassName)(start_state)
+        heuristic = getattr(search_agents_module, self.heuristicName)
+
+        # Stop the search as soon as it goes over budget instead of letting it blow up
+        get_successors = problem.get_successors
+        def budgeted_get_successors(state):
+            if problem._expanded >= self.max_expanded:
+                raise SearchBudgetExceeded()
+            return get_successors(state)
+        problem.get_successors = budgeted_get_successors
+        return problem, heuristic
+
+    def execute(self, grades, module_dict, solution_dict):
+        search = module_dict['search']
+        search_agents_module = module_dict['search_agents']
+        problem, heuristic = self.setup_problem(search_agents_module)
+        try:
+            solution = getattr(search, self.alg)(problem, heuristic)
+        except SearchBudgetExceeded:
+            grades.add_message('FAIL: %s' % self.path)
+            grades.add_message('%s expanded more than %d nodes; are duplicate states pruned?' % (self.alg, self.max_expanded))
+            return False
+
+        if not check_solution(problem, solution):
+            grades.add_message('FAIL: %s' % self.path)
+            grades.add_message('%s did not return a path to the goal.' % self.alg)
+            return False
+        cost = problem.get_cost_of_actions(solution)
+        if cost != int(solution_dict['solution_cost']):
+            grades.add_message('FAIL: %s' % self.path)
+            grades.add_message('\tsolution cost: %s, optimal cost: %s' % (cost, solution_dict['solution_cost']))
+            return False
+
+        grades.add_message('PASS: %s' % self.path)
+        grades.add_message('\tpacman layout:\t\t%s' % self.layoutName)
+        grades.add_message('\tsolution cost: %s' % cost)
+        grades.add_message('\tnodes expanded:\t\t%s' % problem._expanded)
+        return True
+
+    def write_solution(self, module_dict, file_path):
+        search = module_dict['search']
+        search_agents_module = module_dict['search_agents']
+        problem, heuristic = self.setup_problem(search_agents_module)
+        solution = search.a_star_search(problem, heuristic)
+        handle = open(file_path, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('solution_cost: "%s"\n' % problem.get_cost_of_actions(solution))
+        handle.close()
+        return True
+
+
+class PatternDatabaseTest(test_classes.TestCase):
+    """
+    Solves the listed and some random sliding puzzles with A* and
+    pattern_database_heuristic and checks that every path is as short as
+    the one breadth first search finds, which only holds if the heuristic
+    is consistent.
+    """
+
+    def __init__(self, question, test_dict):
+        super(PatternDatabaseTest, self).__init__(question, test_dict)
+        self.size = int(test_dict['size'])
+        self.puzzles = [[int(number) for number in line.split()]
+                        for line in test_dict.get('puzzles', '').split('\n') if line.strip()]
+        self.random_puzzles = int(test_dict['random_puzzles'])
+        self.moves = int(test_dict['moves'])
+        self.seed = int(test_dict['seed'])
+
+    def execute(self, grades, module_dict, solution_dict):
+        import random
+        import eightpuzzle
+        search = module_dict['search']
+        random.seed(self.seed)
+        puzzles = self.puzzles + [eightpuzzle.create_random_sliding_puzzle(self.size, self.moves)
+                                  for i in range(self.random_puzzles)]
+        for numbers in puzzles:
+            problem = eightpuzzle.SlidingPuzzleSearchProblem(numbers, self.size)
+            path = search.a_star_search(problem, eightpuzzle.pattern_database_heuristic)
+            optimal_path = search.breadth_first_search(eightpuzzle.SlidingPuzzleSearchProblem(numbers, self.size))
+            if len(path) != len(optimal_path):
+                grades.add_message('FAIL: %s' % self.path)
+                grades.add_message('\tpuzzle: %s' % numbers)
+                grades.add_message('\tA* path length: %d, BFS path length: %d' % (len(path), len(optimal_path)))
+                return False
+
+        grades.add_message('PASS: %s' % self.path)
+        grades.add_message('\t%d puzzles solved optimally' % len(puzzles))
+        return True
+
+    def write_solution(self, module_dict, file_path):
+        handle = open(file_path, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('# The paths are checked against breadth first search.\n')
+        handle.close()
+        return True
+
+
 from game import Actions
 def get_states_from_path(start, path):
     """Returns the list of states visited along the path"""
@@ -548,6 +667,38 @@ class HeuristicTest(test_classes.TestCase):
 
 
 
+class JunctionHeuristicTest(HeuristicTest):
+    """
+    Checks a heuristic on the search.JunctionSearchProblem wrapping a
+    problem: it must pass the HeuristicTest checks with corridor successors,
+    and give the same values as on the unwrapped problem.
+    """
+
+    def execute(self, grades, module_dict, solution_dict):
+        search = module_dict['search']
+        search_agents_module = module_dict['search_agents']
+        solution_cost = int(solution_dict['solution_cost'])
+        problem, state, heuristic = self.setup_problem(search_agents_module)
+        junction_problem = search.JunctionSearchProblem(problem, layout.JunctionGraph.for_walls(problem.walls))
+        unwrapped_problem, _, _ = self.setup_problem(search_agents_module)
+
+        passed, message = self.check_heuristic(heuristic, junction_problem, state, solution_cost)
+        if passed:
+            states = [state] + [successor for successor, _, _ in junction_problem.get_successors(state)]
+            for s in states:
+                if heuristic(s, junction_problem) != heuristic(s, unwrapped_problem):
+                    passed, message = False, 'Heuristic differs on the junction graph problem'
+                    break
+
+        if not passed:
+            grades.add_message('FAIL: %s' % self.path)
+            grades.add_message('%s' % message)
+            return False
+        else:
+            grades.add_message('PASS: %s' % self.path)
+            return True
+
+
 class HeuristicGrade(test_classes.TestCase):
 
     def __init__(self, question, test_dict):
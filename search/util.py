@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+import collections
 
 
 class FixedRandom:
@@ -130,46 +131,93 @@ class FixedRandom:
  Data structures useful for implementing SearchAgents
 """
 
+class FrontierIndex:
+    """
+    Counts the keys (key(item)) of the items held by a container, so that
+    membership tests are O(1) instead of a scan of the container.
+    """
+    def __init__(self, key):
+        self.key = key
+        self.counts = {}
+
+    def add(self, item):
+        k = self.key(item)
+        self.counts[k] = self.counts.get(k, 0) + 1
+
+    def remove(self, item):
+        k = self.key(item)
+        remaining = self.counts[k] - 1
+        if remaining:
+            self.counts[k] = remaining
+        else:
+            del self.counts[k]
+
+    def __contains__(self, k):
+        return k in self.counts
+
 class Stack:
-    """A container with a last-in-first-out (LIFO) queuing policy."""
-    def __init__(self):
+    """
+    A container with a last-in-first-out (LIFO) queuing policy.
+
+    If a key function is given, contains(k) tells in O(1) whether an item
+    with key(item) == k is in the stack.  Otherwise contains(item) scans it.
+    """
+    def __init__(self, key=None):
         self.list = []
+        self.index = FrontierIndex(key) if key is not None else None
 
     def push(self,item):
         """Push 'item' onto the stack"""
         self.list.append(item)
+        if self.index is not None: self.index.add(item)
 
     def pop(self):
         """Pop the most recently pushed item from the stack"""
-        return self.list.pop()
+        item = self.list.pop()
+        if self.index is not None: self.index.remove(item)
+        return item
 
     def is_empty(self):
         """Returns true if the stack is empty"""
         return len(self.list) == 0
     
-    def contains(self, item):
-        return item in self.list
+    def contains(self, k):
+        if self.index is None: return k in self.list
+        return k in self.index
 
 class Queue:
-    """A container with a first-in-first-out (FIFO) queuing policy."""
-    def __init__(self):
-        self.list = []
+    """
+    A container with a first-in-first-out (FIFO) queuing policy, backed by a
+    collections.deque so that push and pop are O(1).
+
+    contains works as in Stack.
+    """
+    def __init__(self, key=None):
+        self.list = collections.deque()
+        self.index = FrontierIndex(key) if key is not None else None
 
     def push(self,item):
         """Enqueue the 'item' into the queue"""
-        self.list.insert(0,item)
+        self.list.append(item)
+        if self.index is not None: self.index.add(item)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        item = self.list.popleft()
+        if self.index is not None: self.index.remove(item)
+        return item
 
     def is_empty(self):
         """Returns true if the queue is empty"""
         return len(self.list) == 0
 
+    def contains(self, k):
+        if self.index is None: return k in self.list
+        return k in self.index
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
@@ -208,6 +256,108 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue(PriorityQueue):
+    """
+      A PriorityQueue that holds each item at most once and keeps an index
+      of the heap position of every item, so that update (decrease-key) and
+      remove run in O(log n) and contains in O(1), instead of scanning the
+      heap.  Ties are still broken by insertion order, and an item whose
+      priority changes counts as inserted again: it goes after the items of
+      equal priority already queued, as the duplicate pushed onto a
+      PriorityQueue by an improved path would.
+
+      Items are identified by key(item), or by the item itself if no key
+      function is given (in which case items must be hashable).
+    """
+    def  __init__(self, key=None):
+        super().__init__()
+        self.key = key
+        self.positions = {}
+
+    def _key_of(self, item):
+        return item if self.key is None else self.key(item)
+
+    def push(self, item, priority):
+        """Adds an item, or changes its priority if it is already queued"""
+        k = self._key_of(item)
+        if k in self.positions:
+            self._reprioritize(self.positions[k], priority, item)
+            return
+        self.heap.append((priority, self.count, item))
+        self.positions[k] = len(self.heap) - 1
+        self.count += 1
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        (_, _, item) = self.heap[0]
+        self._remove_at(0)
+        return item
+
+    def update(self, item, priority):
+        # If item already in priority queue with higher priority, update its priority.
+        # If item already in priority queue with equal or lower priority, do nothing.
+        # If item not in priority queue, do the same thing as self.push.
+        k = self._key_of(item)
+        if k not in self.positions:
+            self.push(item, priority)
+        elif priority < self.heap[self.positions[k]][0]:
+            self._reprioritize(self.positions[k], priority, item)
+
+    def contains(self, k):
+        return k in self.positions
+
+    def remove(self, k):
+        """Removes the item with key k from the queue and returns it"""
+        position = self.positions[k]
+        (_, _, item) = self.heap[position]
+        self._remove_at(position)
+        return item
+
+    def _reprioritize(self, position, priority, item):
+        old_entry = self.heap[position]
+        entry = (priority, self.count, item)
+        self.count += 1
+        self.heap[position] = entry
+        if entry < old_entry:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def _remove_at(self, position):
+        (_, _, item) = self.heap[position]
+        del self.positions[self._key_of(item)]
+        last = self.heap.pop()
+        if position < len(self.heap):
+            self.heap[position] = last
+            self.positions[self._key_of(last[2])] = position
+            self._sift_up(position)
+            self._sift_down(self.positions[self._key_of(last[2])])
+
+    def _sift_up(self, position):
+        heap, entry = self.heap, self.heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if heap[parent] <= entry: break
+            heap[position] = heap[parent]
+            self.positions[self._key_of(heap[position][2])] = position
+            position = parent
+        heap[position] = entry
+        self.positions[self._key_of(entry[2])] = position
+
+    def _sift_down(self, position):
+        heap, entry = self.heap, self.heap[position]
+        size = len(heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size: break
+            if child + 1 < size and heap[child + 1] < heap[child]: child += 1
+            if entry <= heap[child]: break
+            heap[position] = heap[child]
+            self.positions[self._key_of(heap[position][2])] = position
+            position = child
+        heap[position] = entry
+        self.positions[self._key_of(entry[2])] = position
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -226,6 +376,46 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class LRUCache:
+    """
+    A dictionary of at most max_size entries that evicts the least recently
+    used entry when it is full, and counts the hits and misses of get.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        "Returns the value stored for key (marking it as recently used), or default"
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        "Removes all the entries and resets the hit and miss counts"
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def memory_usage(self):
+        "Approximate bytes held: the table plus the shallow sizes of its keys and values"
+        return sys.getsizeof(self.entries) + sum(sys.getsizeof(key) + sys.getsizeof(value)
+                                                 for key, value in self.entries.items())
+
+    def __len__(self):
+        return len(self.entries)
+
 def manhattan_distance(xy1, xy2):
     """Returns the Manhattan distance between points xy1 and xy2"""
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )